@@ -98,7 +98,7 @@ def password_reset_confirm(request):
 @login_required
 def profile_view(request):
     
-    recent_items = Item.objects.filter(owner=request.user).order_by('-created_at')[:5]
+    recent_items = Item.objects.filter(owner=request.user).select_related('category', 'primary_image').order_by('-created_at')[:5]
     recent_tips = RecyclingTip.objects.filter(author=request.user).order_by('-created_at')[:5]
     
     return render(request, 'accounts/profile.html', {
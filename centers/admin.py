@@ -1,5 +1,35 @@
+from django import forms
 from django.contrib import admin
 from .models import RecyclingCenter
+from . import materials
 
-# Register your models here.
-admin.site.register(RecyclingCenter)
+
+class RecyclingCenterAdminForm(forms.ModelForm):
+    # Edits the accepted_materials bitmask as a set of checkboxes
+    materials = forms.MultipleChoiceField(
+        choices=RecyclingCenter.MATERIAL_CHOICES,
+        widget=forms.CheckboxSelectMultiple,
+        required=False,
+        label='Accepted materials',
+    )
+
+    class Meta:
+        model = RecyclingCenter
+        exclude = ('accepted_materials',)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.initial['materials'] = materials.from_mask(self.instance.accepted_materials)
+
+    def save(self, commit=True):
+        self.instance.accepted_materials = materials.to_mask(self.cleaned_data['materials'])
+        return super().save(commit)
+
+
+@admin.register(RecyclingCenter)
+class RecyclingCenterAdmin(admin.ModelAdmin):
+    form = RecyclingCenterAdminForm
+    list_display = ('name', 'city', 'state', 'zipcode', 'is_verified', 'updated_at')
+    list_filter = ('state', 'is_verified', 'accepts_dropoff', 'offers_pickup', 'accepts_donations')
+    search_fields = ('name', 'city', 'zipcode', 'address')
+    prepopulated_fields = {'slug': ('name',)}
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class CentersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'centers'
+
+    def ready(self):
+        # Connects the signals that keep the spatial index, opening hours,
+        # map clusters and search trigrams current
+        from . import clusters, hours, spatial, trigrams  # noqa: F401
@@ -0,0 +1,148 @@
+# centers/clusters.py
+# Pre-aggregated map clusters of recycling centers.
+#
+# For every zoom level up to MAX_ZOOM, each web map tile (the usual slippy-map
+# z/x/y scheme) is split into CELLS_PER_TILE x CELLS_PER_TILE cells and
+# MapCluster keeps, per non-empty cell, how many centers fall in it and the
+# sums of their coordinates (so the cluster marker sits at their centroid).
+# A tile request is then one indexed range read of at most 16 rows, whatever
+# the number of centers; a national view is a few hundred clusters.
+#
+# Saves and deletes apply +1/-1 deltas to the affected cells of every zoom
+# level. Bulk writes that bypass signals call rebuild().
+
+import math
+from collections import defaultdict
+
+from django.db import connection, transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .models import MapCluster, RecyclingCenter
+
+MAX_ZOOM = 12
+CELLS_PER_TILE = 4
+MAX_LATITUDE = 85.05112878
+
+
+def _project(latitude, longitude):
+    """Web mercator position of a point, as fractions (0-1) of the world."""
+    lat = math.radians(max(min(float(latitude), MAX_LATITUDE), -MAX_LATITUDE))
+    return (float(longitude) + 180) / 360, (1 - math.log(math.tan(lat) + 1 / math.cos(lat)) / math.pi) / 2
+
+
+def cell(latitude, longitude, zoom):
+    """(cell_x, cell_y) of a point at ``zoom``, in web mercator tile space."""
+    x, y = _project(latitude, longitude)
+    scale = (1 << zoom) * CELLS_PER_TILE
+    return min(int(x * scale), scale - 1), min(int(y * scale), scale - 1)
+
+
+def tile_bounds(zoom, x, y):
+    """(south, west, north, east) of tile x/y at ``zoom``."""
+    scale = 1 << zoom
+
+    def latitude(row):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / scale))))
+
+    return latitude(y + 1), x / scale * 360 - 180, latitude(y), (x + 1) / scale * 360 - 180
+
+
+def _deltas(latitude, longitude, sign):
+    x, y = _project(latitude, longitude)
+    delta = (sign, sign * float(latitude), sign * float(longitude))
+    deltas = {}
+    for zoom in range(MAX_ZOOM + 1):
+        scale = (1 << zoom) * CELLS_PER_TILE
+        deltas[zoom, min(int(x * scale), scale - 1), min(int(y * scale), scale - 1)] = delta
+    return deltas
+
+
+def apply(deltas):
+    """Add {(zoom, cell_x, cell_y): (count, lat_sum, lon_sum)} deltas to the stored clusters."""
+    with transaction.atomic():
+        for (zoom, cell_x, cell_y), (count, lat_sum, lon_sum) in deltas.items():
+            cells = MapCluster.objects.filter(zoom=zoom, cell_x=cell_x, cell_y=cell_y)
+            updated = cells.update(
+                count=F('count') + count, lat_sum=F('lat_sum') + lat_sum, lon_sum=F('lon_sum') + lon_sum,
+            )
+            if not updated and count > 0:
+                MapCluster.objects.create(
+                    zoom=zoom, cell_x=cell_x, cell_y=cell_y, count=count, lat_sum=lat_sum, lon_sum=lon_sum,
+                )
+            elif count < 0:
+                cells.filter(count__lte=0).delete()
+
+
+def rebuild():
+    """Recompute every cluster from the centers table."""
+    totals = defaultdict(lambda: [0, 0.0, 0.0])
+    points = RecyclingCenter.objects.filter(latitude__isnull=False, longitude__isnull=False)
+    for latitude, longitude in points.values_list('latitude', 'longitude').iterator():
+        for key, (count, lat_sum, lon_sum) in _deltas(latitude, longitude, 1).items():
+            total = totals[key]
+            total[0] += count
+            total[1] += lat_sum
+            total[2] += lon_sum
+    # Hundreds of thousands of narrow rows: a plain executemany is several
+    # times faster than building model instances for bulk_create
+    table = connection.ops.quote_name(MapCluster._meta.db_table)
+    with transaction.atomic(), connection.cursor() as cursor:
+        MapCluster.objects.all().delete()
+        cursor.executemany(
+            f'INSERT INTO {table} (zoom, cell_x, cell_y, count, lat_sum, lon_sum) VALUES (%s, %s, %s, %s, %s, %s)',
+            [(*key, *total) for key, total in totals.items()],
+        )
+    return len(totals)
+
+
+def tile(zoom, x, y):
+    """The clusters of one tile at a zoom level up to MAX_ZOOM."""
+    first_x, first_y = x * CELLS_PER_TILE, y * CELLS_PER_TILE
+    return MapCluster.objects.filter(
+        zoom=zoom,
+        cell_x__gte=first_x, cell_x__lt=first_x + CELLS_PER_TILE,
+        cell_y__gte=first_y, cell_y__lt=first_y + CELLS_PER_TILE,
+    )
+
+
+def _point(center):
+    if center.latitude is None or center.longitude is None:
+        return None
+    return float(center.latitude), float(center.longitude)
+
+
+# Stands for coordinates that weren't loaded, and so can't have been changed
+UNLOADED = object()
+
+
+@receiver(post_init, sender=RecyclingCenter)
+def remember_point(sender, instance, **kwargs):
+    if {'latitude', 'longitude'} & instance.get_deferred_fields():
+        instance._cluster_point = UNLOADED
+    else:
+        instance._cluster_point = _point(instance)
+
+
+@receiver(post_save, sender=RecyclingCenter)
+def move_center(sender, instance, created=False, **kwargs):
+    if instance._cluster_point is UNLOADED:
+        return
+    old, new = (None if created else instance._cluster_point), _point(instance)
+    if old == new:
+        return
+    deltas = defaultdict(lambda: (0, 0.0, 0.0))
+    for point, sign in ((old, -1), (new, 1)):
+        if point:
+            for key, delta in _deltas(*point, sign).items():
+                deltas[key] = tuple(a + b for a, b in zip(deltas[key], delta))
+    apply({key: delta for key, delta in deltas.items() if any(delta)})
+    instance._cluster_point = new
+
+
+@receiver(post_delete, sender=RecyclingCenter)
+def remove_center(sender, instance, **kwargs):
+    point = instance._cluster_point
+    if point and point is not UNLOADED:
+        apply(_deltas(*point, -1))
@@ -0,0 +1,174 @@
+# centers/hours.py
+# Structured opening hours for recycling centers.
+#
+# The seven free-text *_hours fields stay the source of truth. On save they
+# are parsed into OpeningInterval rows, each a [start, end) span in minutes of
+# the week (Monday 00:00 is 0), in the center's local wall-clock time. "Open at
+# T" is then an indexed range lookup on (start, end) instead of parsing every
+# center's text per request.
+#
+# Text that can't be parsed yields no intervals, so such a center never shows
+# up as open rather than showing up wrongly.
+
+import re
+from zoneinfo import ZoneInfo
+
+from django.db.models import Q
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import OpeningInterval, RecyclingCenter
+
+DAY_FIELDS = [
+    'monday_hours', 'tuesday_hours', 'wednesday_hours', 'thursday_hours',
+    'friday_hours', 'saturday_hours', 'sunday_hours',
+]
+DAY_CHOICES = [(str(day), field.split('_')[0].title()) for day, field in enumerate(DAY_FIELDS)]
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+# Local time zone of each province/territory (Nunavut spans three; Iqaluit's is used)
+PROVINCE_ZONES = {
+    'BC': 'America/Vancouver',
+    'AB': 'America/Edmonton',
+    'SK': 'America/Regina',
+    'MB': 'America/Winnipeg',
+    'ON': 'America/Toronto',
+    'QC': 'America/Toronto',
+    'NB': 'America/Moncton',
+    'NS': 'America/Halifax',
+    'PE': 'America/Halifax',
+    'NL': 'America/St_Johns',
+    'YT': 'America/Whitehorse',
+    'NT': 'America/Yellowknife',
+    'NU': 'America/Iqaluit',
+}
+
+ALL_DAY_RE = re.compile(r'24\s*(?:hours|hrs|h\b)|24/7|open all day')
+RANGE_RE = re.compile(
+    r'(\d{1,2})(?:[:.h](\d{2}))?\s*(am|pm)?\s*-\s*(\d{1,2})(?:[:.h](\d{2}))?\s*(am|pm)?'
+)
+
+
+def _minutes(hour, minute, meridiem):
+    hour, minute = int(hour), int(minute or 0)
+    if meridiem == 'am' and hour == 12:
+        hour = 0
+    elif meridiem == 'pm' and hour < 12:
+        hour += 12
+    return hour * 60 + minute
+
+
+def parse_day(text):
+    """
+    Parse one day's hours into [(start, end)] minutes of the day, where end
+    may pass 1440 for spans running past midnight. Returns [] for closed days
+    and None for text that can't be understood.
+    """
+    text = (text or '').strip().lower()
+    text = re.sub(r'a\.m\.?', 'am', re.sub(r'p\.m\.?', 'pm', text))
+    text = text.replace('noon', '12pm').replace('midnight', '12am')
+    text = re.sub(r'\s*(?:–|—|\bto\b|\buntil\b|\btill\b)\s*', '-', text)
+    if not text or text in ('n/a', 'none', '-') or ('closed' in text and not re.search(r'\d', text)):
+        return []
+    if ALL_DAY_RE.search(text):
+        return [(0, MINUTES_PER_DAY)]
+
+    spans = []
+    for start_hour, start_minute, start_meridiem, end_hour, end_minute, end_meridiem in RANGE_RE.findall(text):
+        if int(start_hour) > 24 or int(end_hour) > 24 or int(start_minute or 0) > 59 or int(end_minute or 0) > 59:
+            return None
+        if end_meridiem and not start_meridiem:
+            # "9-5pm" means 9am, but "1-5pm" means 1pm
+            start_meridiem = end_meridiem
+            if _minutes(start_hour, start_minute, start_meridiem) > _minutes(end_hour, end_minute, end_meridiem):
+                start_meridiem = 'am'
+        start = _minutes(start_hour, start_minute, start_meridiem)
+        end = _minutes(end_hour, end_minute, end_meridiem)
+        if not start_meridiem and not end_meridiem and end <= start and start <= 12 * 60:
+            # "9-5" is nine to five, not an overnight shift; "22:00-06:00"
+            # and "20-4" start too late for that and do run overnight
+            end += 12 * 60
+        if end <= start:
+            end += MINUTES_PER_DAY
+        spans.append((start, end))
+    return spans or None
+
+
+def weekly_intervals(center):
+    """Merged [(start, end)] minutes of the week the center is open, from its text fields."""
+    spans = []
+    for day, field in enumerate(DAY_FIELDS):
+        for start, end in parse_day(getattr(center, field)) or []:
+            start, end = day * MINUTES_PER_DAY + start, day * MINUTES_PER_DAY + end
+            if end > MINUTES_PER_WEEK:
+                # Sunday night past midnight continues on Monday morning
+                spans.append((0, end - MINUTES_PER_WEEK))
+                end = MINUTES_PER_WEEK
+            spans.append((start, end))
+
+    merged = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def refresh(centers):
+    """Rewrite the OpeningInterval rows of ``centers`` from their hours text."""
+    centers = list(centers)
+    OpeningInterval.objects.filter(center__in=[c.pk for c in centers]).delete()
+    OpeningInterval.objects.bulk_create(
+        [
+            OpeningInterval(center_id=center.pk, start=start, end=end)
+            for center in centers
+            for start, end in weekly_intervals(center)
+        ],
+        batch_size=1000,
+    )
+
+
+def minute_of_week(moment):
+    return moment.weekday() * MINUTES_PER_DAY + moment.hour * 60 + moment.minute
+
+
+def open_at_minute(queryset, minute):
+    """Centers open at ``minute`` of the week in their own local time."""
+    return queryset.filter(pk__in=OpeningInterval.objects.filter(start__lte=minute, end__gt=minute).values('center'))
+
+
+def open_at(queryset, moment=None):
+    """Centers open at the instant ``moment`` (default: now), in each province's local time."""
+    moment = moment or timezone.now()
+    by_minute = {}
+    for province, zone in PROVINCE_ZONES.items():
+        by_minute.setdefault(minute_of_week(moment.astimezone(ZoneInfo(zone))), []).append(province)
+    condition = Q()
+    for minute, provinces in by_minute.items():
+        condition |= Q(
+            state__in=provinces,
+            pk__in=OpeningInterval.objects.filter(start__lte=minute, end__gt=minute).values('center'),
+        )
+    return queryset.filter(condition)
+
+
+def is_open(center, moment=None):
+    moment = (moment or timezone.now()).astimezone(ZoneInfo(PROVINCE_ZONES.get(center.state, 'America/Toronto')))
+    minute = minute_of_week(moment)
+    return any(start <= minute < end for start, end in weekly_intervals(center))
+
+
+@receiver(post_save, sender=RecyclingCenter)
+def refresh_opening_intervals(sender, instance, created=False, update_fields=None, **kwargs):
+    if update_fields and not set(DAY_FIELDS) & set(update_fields):
+        return
+    if not created:
+        # Most edits leave the hours alone; reading the rows is cheaper than rewriting them
+        stored = OpeningInterval.objects.filter(center=instance).order_by('start').values_list('start', 'end')
+        if list(stored) == weekly_intervals(instance):
+            return
+    refresh([instance])
@@ -0,0 +1,74 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import geo
+from centers.spatial import CenterIndex
+
+
+def brute_force(points, latitude, longitude, k):
+    # What a query costs without an index: a distance for every center
+    distances = sorted((geo.haversine_km(latitude, longitude, lat, lon), pk) for pk, lat, lon in points)
+    return [(pk, distance) for distance, pk in distances[:k]]
+
+
+class Command(BaseCommand):
+    help = (
+        'Time the centers k-d tree on synthetic centers clustered around Canadian '
+        'cities, against a linear scan. Works in memory, never touches the database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--centers', type=int, default=50_000)
+        parser.add_argument('--queries', type=int, default=1000)
+        parser.add_argument('--k', type=int, default=10)
+        parser.add_argument('--radius', type=float, default=25.0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['centers'])
+        cities = list(geo.places().values())
+        points = []
+        for pk in range(1, options['centers'] + 1):
+            latitude, longitude, _ = rng.choice(cities)
+            points.append((pk, latitude + rng.gauss(0, 0.25), longitude + rng.gauss(0, 0.35)))
+
+        started = time.perf_counter()
+        index = CenterIndex(points)
+        self.stdout.write(f'{len(index):,} centers, index built in {(time.perf_counter() - started) * 1000:.0f} ms')
+
+        origins = []
+        for _ in range(options['queries']):
+            latitude, longitude, _ = rng.choice(cities)
+            origins.append((latitude + rng.gauss(0, 0.5), longitude + rng.gauss(0, 0.5)))
+
+        k, radius = options['k'], options['radius']
+        self.report(f'nearest k={k}', [lambda o=o: index.nearest(*o, k=k) for o in origins])
+        found = []
+        self.report(f'within {radius:g} km', [lambda o=o: found.append(len(index.within(*o, radius))) for o in origins])
+        self.stdout.write(f'  ({statistics.mean(found):.0f} centers per radius query on average)')
+
+        sample = origins[:20]
+        self.report(f'linear scan k={k}', [lambda o=o: brute_force(points, *o, k) for o in sample])
+
+        # The tree must agree with the scan (distances, so ties can't cause false alarms)
+        for origin in sample:
+            expected = [round(d, 6) for _, d in brute_force(points, *origin, k)]
+            actual = [round(d, 6) for _, d in index.nearest(*origin, k=k)]
+            if expected != actual:
+                self.stderr.write(f'Mismatch at {origin}: {actual} != {expected}')
+                return
+        self.stdout.write(self.style.SUCCESS(f'Index results match the linear scan on {len(sample)} queries.'))
+
+    def report(self, label, calls):
+        timings = []
+        for call in calls:
+            started = time.perf_counter()
+            call()
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        self.stdout.write(
+            f'  {label:22} p50 {statistics.median(timings):8.3f} ms   p95 {p95:8.3f} ms   ({len(timings)} queries)'
+        )
@@ -0,0 +1,85 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from core import geo
+from centers import trigrams
+from centers.models import RecyclingCenter
+
+STREETS = ['Main St', 'King St W', 'Queen St E', 'Dundas St', 'Yonge St', 'Bloor St', 'Rue Sainte-Catherine', 'Granville St']
+KINDS = ['Eco Depot', 'Recycling Centre', 'Waste Transfer Station', 'Community Drop-off', 'Return-It Depot', 'Ecocentre']
+QUERIES = ['mississauga', 'missisauga', 'eco depot', 'ecodepot', 'sainte catherine', 'recyling centre', 'zzzz']
+
+
+class Rollback(Exception):
+    pass
+
+
+def scan(queryset, query):
+    # The lookup the list view used before centers.trigrams
+    return queryset.filter(
+        Q(name__icontains=query) |
+        Q(city__icontains=query) |
+        Q(address__icontains=query) |
+        Q(state__icontains=query) |
+        Q(description__icontains=query)
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the icontains scan with the trigram index for center search on synthetic '
+        'centers. Works inside a transaction that is always rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--centers', type=int, default=20_000)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options['centers'], options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, size, repeat):
+        rng = random.Random(size)
+        cities = [name.title() for name in geo.places()]
+        centers = [
+            RecyclingCenter(
+                name=f'{rng.choice(cities)} {rng.choice(KINDS)}',
+                slug=f'bench-center-{n}',
+                description=' '.join(rng.choices(KINDS + cities, k=30)),
+                address=f'{rng.randint(1, 9999)} {rng.choice(STREETS)}',
+                city=rng.choice(cities),
+                state='ON',
+                zipcode='',
+            )
+            for n in range(size)
+        ]
+        started = time.perf_counter()
+        RecyclingCenter.objects.bulk_create(centers, batch_size=500)
+        trigrams.refresh(centers)
+        self.stdout.write(f'{size:,} centers (loaded and indexed in {time.perf_counter() - started:.1f}s)')
+
+        queryset = RecyclingCenter.objects.all()
+        for query in QUERIES:
+            scanned, scan_hits = self.time_it(repeat, lambda: list(scan(queryset, query)[:15]), lambda: scan(queryset, query).count())
+            fuzzy, fuzzy_hits = self.time_it(repeat, lambda: list(trigrams.search(queryset, query)[:15]), lambda: trigrams.search(queryset, query).count())
+            self.stdout.write(
+                f'  {query!r:20} icontains {scan_hits:>6} hits {scanned * 1000:8.1f} ms   '
+                f'trigram {fuzzy_hits:>6} hits {fuzzy * 1000:8.1f} ms'
+            )
+
+    def time_it(self, repeat, page, count):
+        best = float('inf')
+        for _ in range(repeat):
+            started = time.perf_counter()
+            page()
+            best = min(best, time.perf_counter() - started)
+        return best, count()
@@ -0,0 +1,226 @@
+import csv
+import json
+import time
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from core import geo, refdata, stats
+from core.slugs import allocate_slugs
+from centers import clusters, hours, materials, spatial, trigrams
+from centers.models import CANADIAN_PROVINCES, RecyclingCenter
+
+TEXT_FIELDS = [
+    'description', 'address', 'city', 'state', 'zipcode', 'country', 'phone', 'email', 'website',
+    'monday_hours', 'tuesday_hours', 'wednesday_hours', 'thursday_hours',
+    'friday_hours', 'saturday_hours', 'sunday_hours',
+]
+FLAG_FIELDS = ['accepts_dropoff', 'offers_pickup', 'accepts_donations', 'is_verified']
+TRUE_VALUES = {'1', 'true', 'yes', 'y', 'on'}
+
+PROVINCES = {code: code for code, _ in CANADIAN_PROVINCES}
+PROVINCES.update({name.lower(): code for code, name in CANADIAN_PROVINCES})
+
+
+def natural_key(name, zipcode):
+    """Centers are the same center when name and postal code match, ignoring case and spacing."""
+    return ' '.join(name.lower().split()), ''.join(zipcode.upper().split())
+
+
+def to_decimal(value):
+    if value in (None, ''):
+        return None
+    try:
+        return round(Decimal(str(value)), 6)
+    except InvalidOperation:
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Load recycling centers from CSV or GeoJSON, inserting new centers and updating '
+        'existing ones matched on name + postal code. Columns/properties are the '
+        'RecyclingCenter field names; accepted_materials is a comma-separated list. Missing coordinates are filled from the postal-code '
+        'centroid table (falling back to the city); existing centers without coordinates '
+        'are backfilled the same way. Opening hours are re-parsed for new and changed centers.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['csv', 'geojson'], help='Defaults to the file extension.')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument('--dry-run', action='store_true', help='Report what would change without writing.')
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.exists():
+            raise CommandError(f'{path} does not exist')
+        fmt = options['format'] or ('geojson' if path.suffix in ('.geojson', '.json', '.geojsonl') else 'csv')
+
+        rows = self.read(path, fmt)
+        totals = {'created': 0, 'updated': 0, 'unchanged': 0, 'skipped': 0, 'geocoded': 0}
+        started = time.perf_counter()
+        try:
+            with transaction.atomic():
+                while True:
+                    chunk = list(islice(rows, options['chunk_size']))
+                    if not chunk:
+                        break
+                    for key, count in self.load_chunk(chunk).items():
+                        totals[key] += count
+                    read = sum(totals[key] for key in ('created', 'updated', 'unchanged', 'skipped'))
+                    self.stdout.write(f"{read} rows read, {totals['created']} created, {totals['updated']} updated")
+                totals['backfilled'] = self.backfill_existing()
+                # Cheaper than per-row cluster deltas for a bulk load
+                clusters.rebuild()
+                stats.refresh('centers')
+                if options['dry_run']:
+                    transaction.set_rollback(True)
+        finally:
+            spatial.invalidate()
+            refdata.center_cities.invalidate()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"{'Would load' if options['dry_run'] else 'Loaded'} in {elapsed:.1f}s: "
+            f"{totals['created']} created, {totals['updated']} updated, {totals['unchanged']} unchanged, "
+            f"{totals['skipped']} skipped; {totals['geocoded']} geocoded from postal code or city, "
+            f"{totals['backfilled']} existing centers backfilled."
+        ))
+
+    def read(self, path, fmt):
+        with open(path, newline='', encoding='utf-8') as fh:
+            if fmt == 'csv':
+                yield from csv.DictReader(fh)
+            elif path.suffix == '.geojsonl':
+                for line in fh:
+                    if line.strip():
+                        yield self.from_feature(json.loads(line))
+            else:
+                # A FeatureCollection is one JSON document, so it is parsed whole
+                for feature in json.load(fh).get('features', []):
+                    yield self.from_feature(feature)
+
+    def from_feature(self, feature):
+        row = dict(feature.get('properties') or {})
+        geometry = feature.get('geometry') or {}
+        if geometry.get('type') == 'Point' and len(geometry.get('coordinates') or []) >= 2:
+            row['longitude'], row['latitude'] = geometry['coordinates'][:2]
+        return row
+
+    def clean(self, row):
+        values = {'name': (row.get('name') or '').strip()[:200]}
+        for field in TEXT_FIELDS:
+            value = row.get(field)
+            if value not in (None, ''):
+                values[field] = str(value).strip()[:RecyclingCenter._meta.get_field(field).max_length or None]
+        if 'state' in values:
+            values['state'] = PROVINCES.get(values['state'].upper()) or PROVINCES.get(values['state'].lower())
+        for field in FLAG_FIELDS:
+            value = row.get(field)
+            if value not in (None, ''):
+                values[field] = value if isinstance(value, bool) else str(value).strip().lower() in TRUE_VALUES
+        accepted = row.get('accepted_materials')
+        if accepted not in (None, ''):
+            # "batteries, electronics" in CSV, a list in GeoJSON properties
+            values['accepted_materials'] = materials.to_mask(
+                materials.parse(accepted) if isinstance(accepted, str) else materials.parse(','.join(accepted))
+            )
+        latitude, longitude = to_decimal(row.get('latitude')), to_decimal(row.get('longitude'))
+        if latitude is not None and longitude is not None:
+            values['latitude'], values['longitude'] = latitude, longitude
+        return values
+
+    def load_chunk(self, chunk):
+        counts = {'created': 0, 'updated': 0, 'unchanged': 0, 'skipped': 0, 'geocoded': 0}
+        incoming = {}
+        for row in chunk:
+            values = self.clean(row)
+            if not values['name'] or not values.get('zipcode') or not values.get('state'):
+                counts['skipped'] += 1
+                continue
+            # A later row for the same center wins
+            incoming[natural_key(values['name'], values['zipcode'])] = values
+
+        # Candidates come through the zipcode index, in the spellings postal codes are stored in
+        zipcodes = set()
+        for _, compact in incoming:
+            spaced = f'{compact[:3]} {compact[3:]}'.strip()
+            zipcodes |= {compact, spaced, compact.lower(), spaced.lower()}
+        zipcodes |= {values['zipcode'] for values in incoming.values()}
+        existing = {
+            natural_key(center.name, center.zipcode): center
+            for center in RecyclingCenter.objects.filter(zipcode__in=zipcodes)
+        }
+
+        now = timezone.now()
+        created, updated, changed_fields, rehours, reindex = [], [], set(), set(), set()
+        for key, values in incoming.items():
+            center = existing.get(key)
+            if center is None:
+                created.append(RecyclingCenter(**values))
+                continue
+            changed = {field for field, value in values.items() if getattr(center, field) != value}
+            if not changed:
+                counts['unchanged'] += 1
+                continue
+            for field in changed:
+                setattr(center, field, values[field])
+            center.updated_at = now
+            if changed & set(hours.DAY_FIELDS):
+                rehours.add(center.pk)
+            if changed & set(trigrams.FIELDS):
+                reindex.add(center.pk)
+            changed_fields |= changed
+            updated.append(center)
+
+        counts['geocoded'] = self.fill_coordinates(created + updated)
+        if counts['geocoded']:
+            changed_fields |= {'latitude', 'longitude'}
+
+        for center, slug in zip(created, allocate_slugs(RecyclingCenter, [slugify(c.name) for c in created])):
+            center.slug = slug
+        RecyclingCenter.objects.bulk_create(created, batch_size=500)
+        if updated:
+            RecyclingCenter.objects.bulk_update(updated, sorted(changed_fields | {'updated_at'}), batch_size=500)
+        # bulk writes skip the post_save receivers that parse opening hours and index search text
+        hours.refresh(created + [c for c in updated if c.pk in rehours])
+        trigrams.refresh(created + [c for c in updated if c.pk in reindex])
+        counts['created'], counts['updated'] = len(created), len(updated)
+        return counts
+
+    def fill_coordinates(self, centers):
+        """
+        Coordinates for centers that have none, with one lookup per distinct
+        postal code (or city, when the postal code is unknown).
+        """
+        missing = [c for c in centers if c.latitude is None or c.longitude is None]
+        points = {}
+        for center in missing:
+            key = (center.zipcode, center.city)
+            if key not in points:
+                points[key] = geo.geocode_address(center.zipcode, center.city)
+        filled = 0
+        for center in missing:
+            point = points[center.zipcode, center.city]
+            if point:
+                center.latitude, center.longitude = to_decimal(point[0]), to_decimal(point[1])
+                filled += 1
+        return filled
+
+    def backfill_existing(self):
+        centers = list(
+            RecyclingCenter.objects.filter(latitude__isnull=True)
+            .only('pk', 'zipcode', 'city', 'latitude', 'longitude')
+        )
+        filled = self.fill_coordinates(centers)
+        if filled:
+            RecyclingCenter.objects.bulk_update(
+                [c for c in centers if c.latitude is not None], ['latitude', 'longitude'], batch_size=500
+            )
+        return filled
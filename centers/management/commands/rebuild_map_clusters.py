@@ -0,0 +1,16 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from centers import clusters
+
+
+class Command(BaseCommand):
+    help = 'Recompute the precomputed map clusters of recycling centers from scratch.'
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = clusters.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Built {count} clusters over zoom levels 0-{clusters.MAX_ZOOM} in {time.perf_counter() - started:.1f}s.'
+        ))
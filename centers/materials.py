@@ -0,0 +1,56 @@
+# centers/materials.py
+# Accepted materials as a bitmask on RecyclingCenter.accepted_materials.
+#
+# Bit i stands for RecyclingCenter.MATERIAL_CHOICES[i], so new materials must
+# be appended to the choices, never inserted or reordered. With nine materials
+# there are only 512 possible masks, so "accepts batteries AND electronics"
+# becomes `accepted_materials IN (<every mask containing both bits>)`, which
+# the column index answers directly, with no join.
+
+from .models import RecyclingCenter
+
+BITS = {value: 1 << index for index, (value, _) in enumerate(RecyclingCenter.MATERIAL_CHOICES)}
+ALL = (1 << len(BITS)) - 1
+
+
+def to_mask(values):
+    """Bitmask for an iterable of material values; unknown values are ignored."""
+    mask = 0
+    for value in values:
+        mask |= BITS.get(value, 0)
+    return mask
+
+
+def from_mask(mask):
+    return [value for value, bit in BITS.items() if mask & bit]
+
+
+def parse(text):
+    """Material values from "batteries, electronics; Glass" style text."""
+    labels = {label.lower(): value for value, label in RecyclingCenter.MATERIAL_CHOICES}
+    values = []
+    for part in text.replace(';', ',').replace('|', ',').split(','):
+        part = part.strip().lower()
+        value = part if part in BITS else labels.get(part)
+        if value:
+            values.append(value)
+    return values
+
+
+def supersets(mask):
+    """Every possible mask that has all the bits of ``mask``."""
+    free = ALL & ~mask
+    masks, subset = [], free
+    while True:
+        masks.append(mask | subset)
+        if not subset:
+            return masks
+        subset = (subset - 1) & free
+
+
+def filter_accepting(queryset, values):
+    """Centers that accept every material in ``values``."""
+    mask = to_mask(values)
+    if not mask:
+        return queryset
+    return queryset.filter(accepted_materials__in=supersets(mask))
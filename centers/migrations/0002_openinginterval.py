@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from centers.hours import weekly_intervals
+
+
+def parse_hours(apps, schema_editor):
+    RecyclingCenter = apps.get_model('centers', 'RecyclingCenter')
+    OpeningInterval = apps.get_model('centers', 'OpeningInterval')
+    OpeningInterval.objects.bulk_create(
+        [
+            OpeningInterval(center_id=center.pk, start=start, end=end)
+            for center in RecyclingCenter.objects.iterator()
+            for start, end in weekly_intervals(center)
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('centers', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OpeningInterval',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start', models.PositiveIntegerField()),
+                ('end', models.PositiveIntegerField()),
+                ('center', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='opening_intervals', to='centers.recyclingcenter')),
+            ],
+            options={
+                'ordering': ['center', 'start'],
+                'indexes': [models.Index(fields=['start', 'end'], name='centers_ope_start_87c25e_idx')],
+            },
+        ),
+        migrations.RunPython(parse_hours, migrations.RunPython.noop),
+    ]
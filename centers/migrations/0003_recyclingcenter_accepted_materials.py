@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('centers', '0002_openinginterval'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recyclingcenter',
+            name='accepted_materials',
+            field=models.PositiveIntegerField(db_index=True, default=0),
+        ),
+    ]
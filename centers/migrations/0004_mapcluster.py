@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:40
+
+from collections import defaultdict
+
+from django.db import migrations, models
+
+from centers.clusters import MAX_ZOOM, cell
+
+
+def build_clusters(apps, schema_editor):
+    RecyclingCenter = apps.get_model('centers', 'RecyclingCenter')
+    MapCluster = apps.get_model('centers', 'MapCluster')
+    totals = defaultdict(lambda: [0, 0.0, 0.0])
+    points = RecyclingCenter.objects.filter(latitude__isnull=False, longitude__isnull=False)
+    for latitude, longitude in points.values_list('latitude', 'longitude'):
+        for zoom in range(MAX_ZOOM + 1):
+            total = totals[(zoom, *cell(latitude, longitude, zoom))]
+            total[0] += 1
+            total[1] += float(latitude)
+            total[2] += float(longitude)
+    MapCluster.objects.bulk_create(
+        [
+            MapCluster(zoom=zoom, cell_x=x, cell_y=y, count=count, lat_sum=lat_sum, lon_sum=lon_sum)
+            for (zoom, x, y), (count, lat_sum, lon_sum) in totals.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('centers', '0003_recyclingcenter_accepted_materials'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MapCluster',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('zoom', models.PositiveSmallIntegerField()),
+                ('cell_x', models.PositiveIntegerField()),
+                ('cell_y', models.PositiveIntegerField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('lat_sum', models.FloatField(default=0)),
+                ('lon_sum', models.FloatField(default=0)),
+            ],
+            options={
+                'unique_together': {('zoom', 'cell_x', 'cell_y')},
+            },
+        ),
+        migrations.RunPython(build_clusters, migrations.RunPython.noop),
+    ]
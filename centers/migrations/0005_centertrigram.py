@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from centers.trigrams import center_trigrams
+
+
+def index_centers(apps, schema_editor):
+    RecyclingCenter = apps.get_model('centers', 'RecyclingCenter')
+    CenterTrigram = apps.get_model('centers', 'CenterTrigram')
+    CenterTrigram.objects.bulk_create(
+        [
+            CenterTrigram(trigram=gram, center_id=center.pk)
+            for center in RecyclingCenter.objects.iterator()
+            for gram in center_trigrams(center)
+        ],
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('centers', '0004_mapcluster'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CenterTrigram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trigram', models.CharField(max_length=3)),
+                ('center', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trigrams', to='centers.recyclingcenter')),
+            ],
+            options={
+                'unique_together': {('trigram', 'center')},
+            },
+        ),
+        migrations.RunPython(index_centers, migrations.RunPython.noop),
+    ]
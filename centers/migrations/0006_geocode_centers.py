@@ -0,0 +1,30 @@
+from decimal import Decimal
+
+from django.db import migrations
+
+from core.geo import geocode_address
+
+
+def geocode_centers(apps, schema_editor):
+    RecyclingCenter = apps.get_model('centers', 'RecyclingCenter')
+    centers = list(
+        RecyclingCenter.objects.filter(latitude__isnull=True) | RecyclingCenter.objects.filter(longitude__isnull=True)
+    )
+    located = []
+    for center in centers:
+        point = geocode_address(center.zipcode, center.city)
+        if point:
+            center.latitude, center.longitude = (round(Decimal(str(value)), 6) for value in point)
+            located.append(center)
+    RecyclingCenter.objects.bulk_update(located, ['latitude', 'longitude'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('centers', '0005_centertrigram'),
+    ]
+
+    operations = [
+        migrations.RunPython(geocode_centers, migrations.RunPython.noop),
+    ]
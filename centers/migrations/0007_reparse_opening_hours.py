@@ -0,0 +1,29 @@
+from django.db import migrations
+
+from centers.hours import weekly_intervals
+
+
+def reparse_hours(apps, schema_editor):
+    # Overnight 24-hour ranges ("22:00-06:00") were parsed as ending the next afternoon
+    RecyclingCenter = apps.get_model('centers', 'RecyclingCenter')
+    OpeningInterval = apps.get_model('centers', 'OpeningInterval')
+    OpeningInterval.objects.all().delete()
+    OpeningInterval.objects.bulk_create(
+        [
+            OpeningInterval(center_id=center.pk, start=start, end=end)
+            for center in RecyclingCenter.objects.iterator()
+            for start, end in weekly_intervals(center)
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('centers', '0006_geocode_centers'),
+    ]
+
+    operations = [
+        migrations.RunPython(reparse_hours, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+from collections import defaultdict
+
+from django.db import migrations
+
+from centers import spatial
+from centers.clusters import MAX_ZOOM, cell
+from core import refdata
+
+
+def rebuild_clusters(apps, schema_editor):
+    # 0006 located centers with bulk_update, which the cluster and index signals never saw
+    RecyclingCenter = apps.get_model('centers', 'RecyclingCenter')
+    MapCluster = apps.get_model('centers', 'MapCluster')
+    totals = defaultdict(lambda: [0, 0.0, 0.0])
+    points = RecyclingCenter.objects.filter(latitude__isnull=False, longitude__isnull=False)
+    for latitude, longitude in points.values_list('latitude', 'longitude'):
+        for zoom in range(MAX_ZOOM + 1):
+            total = totals[(zoom, *cell(latitude, longitude, zoom))]
+            total[0] += 1
+            total[1] += float(latitude)
+            total[2] += float(longitude)
+    MapCluster.objects.all().delete()
+    MapCluster.objects.bulk_create(
+        [
+            MapCluster(zoom=zoom, cell_x=x, cell_y=y, count=count, lat_sum=lat_sum, lon_sum=lon_sum)
+            for (zoom, x, y), (count, lat_sum, lon_sum) in totals.items()
+        ],
+        batch_size=1000,
+    )
+    spatial.invalidate()
+    refdata.center_cities.invalidate()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('centers', '0007_reparse_opening_hours'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_clusters, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,9 @@
+from decimal import Decimal
+
 from django.db import models
 from django.utils.text import slugify
+from core import geo
+from core.slugs import save_with_unique_slug
 
 # Canadian provinces/territories choices
 CANADIAN_PROVINCES = [
@@ -19,6 +23,10 @@ CANADIAN_PROVINCES = [
 ]
 
 
+# Fields a center's coordinates are geocoded from
+ADDRESS_FIELDS = ('zipcode', 'city', 'state')
+
+
 class RecyclingCenter(models.Model):
     MATERIAL_CHOICES = [
         ('paper', 'Paper'),
@@ -59,6 +67,9 @@ class RecyclingCenter(models.Model):
     saturday_hours = models.CharField(max_length=50, blank=True, default='Closed')
     sunday_hours = models.CharField(max_length=50, blank=True, default='Closed')
 
+    # Bit i set when the center accepts MATERIAL_CHOICES[i]; see centers.materials
+    accepted_materials = models.PositiveIntegerField(default=0, db_index=True)
+
     # Features
     accepts_dropoff = models.BooleanField(default=True)
     offers_pickup = models.BooleanField(default=False)
@@ -77,24 +88,116 @@ class RecyclingCenter(models.Model):
             models.Index(fields=['zipcode']),
         ]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_location()
+        return instance
+
+    def _remember_location(self):
+        # What save() compares against to tell an address edit from new coordinates
+        deferred = self.get_deferred_fields()
+        self._loaded_location = {
+            name: getattr(self, name) for name in (*ADDRESS_FIELDS, 'latitude', 'longitude') if name not in deferred
+        }
+
+    def _changed(self, names):
+        loaded = getattr(self, '_loaded_location', {})
+        return any(name in loaded and loaded[name] != getattr(self, name) for name in names)
+
     def save(self, *args, **kwargs):
+        # Geocode centers without coordinates, and centers whose address
+        # changed unless new coordinates came with it (e.g. from a data feed)
+        update_fields = kwargs.get('update_fields')
+        located = self.latitude is not None and self.longitude is not None
+        moved = self._changed(ADDRESS_FIELDS) and not self._changed(('latitude', 'longitude'))
+        if (not located or moved) and (update_fields is None or set(ADDRESS_FIELDS) & set(update_fields)):
+            self.geocode()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'latitude', 'longitude'}
         if not self.slug:
-            base_slug = slugify(self.name)
-            slug = base_slug
-            counter = 1
-            while RecyclingCenter.objects.filter(slug=slug).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-            self.slug = slug
-        super().save(*args, **kwargs)
+            save_with_unique_slug(self, slugify(self.name), super().save, *args, **kwargs)
+        else:
+            super().save(*args, **kwargs)
+        self._remember_location()
 
     def __str__(self):
         return f"{self.name} - {self.city}"
 
+    def geocode(self):
+        """Set latitude/longitude from the postal code, or failing that the city."""
+        point = geo.geocode_address(self.zipcode, self.city)
+        self.latitude, self.longitude = (
+            (round(Decimal(str(point[0])), 6), round(Decimal(str(point[1])), 6)) if point else (None, None)
+        )
+
     def get_full_address(self):
         return f"{self.address}, {self.city}, {self.get_state_display()} {self.zipcode}"
 
     def get_state_name(self):
         return self.get_state_display()
 
+    def get_accepted_materials_display(self):
+        return [
+            label for index, (_, label) in enumerate(self.MATERIAL_CHOICES)
+            if self.accepted_materials & (1 << index)
+        ]
+
+
+class OpeningInterval(models.Model):
+    """
+    A span of the week a center is open, in minutes from Monday 00:00 local
+    time. Derived from the *_hours text by centers.hours; never edited directly.
+    """
+    center = models.ForeignKey(RecyclingCenter, on_delete=models.CASCADE, related_name='opening_intervals')
+    start = models.PositiveIntegerField()
+    end = models.PositiveIntegerField()
+
+    class Meta:
+        ordering = ['center', 'start']
+        indexes = [
+            models.Index(fields=['start', 'end']),
+        ]
+
+    def __str__(self):
+        return f"{self.center_id}: {self.start}-{self.end}"
+
+
+class MapCluster(models.Model):
+    """
+    Centers aggregated per map zoom level and grid cell (a quarter of a web
+    map tile on each side); maintained incrementally by centers.clusters.
+    """
+    zoom = models.PositiveSmallIntegerField()
+    cell_x = models.PositiveIntegerField()
+    cell_y = models.PositiveIntegerField()
+    count = models.PositiveIntegerField(default=0)
+    lat_sum = models.FloatField(default=0)
+    lon_sum = models.FloatField(default=0)
+
+    class Meta:
+        unique_together = ('zoom', 'cell_x', 'cell_y')
+
+    def __str__(self):
+        return f"z{self.zoom} ({self.cell_x}, {self.cell_y}): {self.count}"
 
+    @property
+    def latitude(self):
+        return self.lat_sum / self.count
+
+    @property
+    def longitude(self):
+        return self.lon_sum / self.count
+
+
+class CenterTrigram(models.Model):
+    """One distinct trigram of a center's name, city or address; see centers.trigrams."""
+    trigram = models.CharField(max_length=3)
+    center = models.ForeignKey(RecyclingCenter, on_delete=models.CASCADE, related_name='trigrams')
+
+    class Meta:
+        # Leading on trigram: the lookup is "which centers have these trigrams"
+        unique_together = ('trigram', 'center')
+
+    def __str__(self):
+        return f"{self.trigram!r} -> {self.center_id}"
@@ -0,0 +1,203 @@
+# centers/search.py
+# Center search shared by the HTML search page and the JSON search API.
+#
+# CenterSearch turns query parameters into a filtered queryset, plus, for
+# searches around a location, the matching centers' ids nearest first from
+# the spatial index. Both front ends page through it with a bounded page size
+# and only load the rows of the page they render.
+
+import hashlib
+
+from django.core.paginator import Paginator
+from django.db.models import Count, Max, Q
+from django.urls import reverse
+from django.utils import timezone
+
+from core import geo
+from .models import RecyclingCenter
+from . import hours, materials, spatial, trigrams
+
+DEFAULT_RADIUS_KM = 25
+MAX_RADIUS_KM = 500
+
+# Most centers a location search ranks by distance
+MAX_SPATIAL_RESULTS = 1000
+
+
+def get_origin(params, default_radius=DEFAULT_RADIUS_KM):
+    """
+    (latitude, longitude, radius_km) from ?lat=&lon= or ?near=<place or postal
+    code>, plus an optional ?radius=, or None when no usable location was given.
+    """
+    try:
+        point = float(params['lat']), float(params['lon'])
+        if not (-90 <= point[0] <= 90 and -180 <= point[1] <= 180):
+            point = None
+    except (KeyError, ValueError):
+        point = geo.geocode(params.get('near', ''))
+    if not point:
+        return None
+    try:
+        radius = float(params.get('radius') or default_radius)
+    except ValueError:
+        radius = default_radius
+    return point[0], point[1], min(max(radius, 1), MAX_RADIUS_KM)
+
+
+def with_place_matches(hits, queryset, text, origin):
+    """
+    ``hits`` followed by the centers of ``queryset`` whose city or postal code
+    contains ``text`` but that the radius search missed: centers without
+    coordinates, or geocoded only roughly (e.g. from a one-letter postal
+    prefix). Those come by distance from ``origin``, unlocated ones last.
+    """
+    seen = {pk for pk, _ in hits}
+    extra = []
+    matches = queryset.filter(Q(city__icontains=text) | Q(zipcode__icontains=text))
+    for pk, latitude, longitude in matches.values_list('pk', 'latitude', 'longitude'):
+        if pk in seen:
+            continue
+        located = latitude is not None and longitude is not None
+        distance = geo.haversine_km(origin[0], origin[1], float(latitude), float(longitude)) if located else None
+        extra.append((pk, distance))
+    extra.sort(key=lambda hit: (hit[1] is None, hit[1] or 0.0))
+    return hits + extra
+
+
+def filter_open(queryset, params):
+    """
+    ?open_now=on keeps centers open right now in their local time;
+    ?open_day=<0-6, Monday first>&open_time=HH:MM keeps centers open then.
+    """
+    if params.get('open_now') == 'on':
+        return hours.open_at(queryset)
+    day, time = params.get('open_day', ''), params.get('open_time', '')
+    if not day and not time:
+        return queryset
+    try:
+        hour, minute = map(int, (time or '12:00').split(':'))
+        day = int(day) if day else timezone.localtime().weekday()
+    except ValueError:
+        return queryset
+    if not (0 <= day <= 6 and 0 <= hour <= 23 and 0 <= minute <= 59):
+        return queryset
+    return hours.open_at_minute(queryset, day * hours.MINUTES_PER_DAY + hour * 60 + minute)
+
+
+def _distance(center):
+    distance = getattr(center, 'distance_km', 0.0)
+    return None if distance is None else round(distance, 2)
+
+
+# API field name -> (model columns it needs, value for a center)
+FIELDS = {
+    'name': (['name'], lambda center, request: center.name),
+    'slug': (['slug'], lambda center, request: center.slug),
+    'url': (['slug'], lambda center, request: request.build_absolute_uri(
+        reverse('centers:center_detail', args=[center.slug]))),
+    'description': (['description'], lambda center, request: center.description),
+    'address': (['address', 'city', 'state', 'zipcode'], lambda center, request: center.get_full_address()),
+    'city': (['city'], lambda center, request: center.city),
+    'state': (['state'], lambda center, request: center.state),
+    'zipcode': (['zipcode'], lambda center, request: center.zipcode),
+    'phone': (['phone'], lambda center, request: center.phone),
+    'email': (['email'], lambda center, request: center.email),
+    'website': (['website'], lambda center, request: center.website),
+    'latitude': (['latitude'], lambda center, request: None if center.latitude is None else float(center.latitude)),
+    'longitude': (['longitude'], lambda center, request: None if center.longitude is None else float(center.longitude)),
+    'hours': (hours.DAY_FIELDS, lambda center, request: [getattr(center, field) for field in hours.DAY_FIELDS]),
+    'materials': (['accepted_materials'], lambda center, request: materials.from_mask(center.accepted_materials)),
+    'accepts_dropoff': (['accepts_dropoff'], lambda center, request: center.accepts_dropoff),
+    'offers_pickup': (['offers_pickup'], lambda center, request: center.offers_pickup),
+    'accepts_donations': (['accepts_donations'], lambda center, request: center.accepts_donations),
+    'is_verified': (['is_verified'], lambda center, request: center.is_verified),
+    'updated_at': (['updated_at'], lambda center, request: center.updated_at.isoformat()),
+    'distance_km': ([], lambda center, request: _distance(center)),
+}
+DEFAULT_FIELDS = ['name', 'slug', 'url', 'city', 'state', 'latitude', 'longitude']
+
+
+def select_fields(value, located=False):
+    """Known field names from a comma-separated ?fields= value, or the defaults."""
+    fields = [name for name in (value or '').split(',') if name in FIELDS] or list(DEFAULT_FIELDS)
+    if located and not value and 'distance_km' not in fields:
+        fields.append('distance_km')
+    return list(dict.fromkeys(fields))
+
+
+def serialize(center, fields, request):
+    return {name: FIELDS[name][1](center, request) for name in fields}
+
+
+class CenterSearch:
+    """
+    Filters: q (fuzzy, over name/city/address), state, material (repeatable),
+    open_now / open_day / open_time, and a location given as ?location= (a
+    place or postal code, otherwise a city/postal substring), ?near= or
+    ?lat=&lon=, with ?radius=.
+    """
+
+    def __init__(self, params):
+        self.params = params
+        queryset = RecyclingCenter.objects.all()
+
+        state = params.get('state', '')
+        if state:
+            queryset = queryset.filter(state=state.upper())
+
+        queryset = materials.filter_accepting(queryset, params.getlist('material'))
+        queryset = filter_open(queryset, params)
+
+        location = params.get('location', '')
+        self.origin = get_origin({'near': location, 'radius': params.get('radius')}) if location else get_origin(params)
+        if location and not self.origin:
+            queryset = queryset.filter(Q(city__icontains=location) | Q(zipcode__icontains=location))
+        self.place = (location or params.get('near', '')) if self.origin else ''
+
+        # Last, so the fuzzy ranking only considers centers the filters kept
+        query = params.get('q', '')
+        if query:
+            queryset = trigrams.search(queryset, query)
+        self.queryset = queryset
+        self._hits = None
+
+    @property
+    def hits(self):
+        """
+        [(pk, distance_km)] of matching centers nearest first, for location
+        searches, then other centers matching the place by name; see with_place_matches.
+        """
+        if self.origin and self._hits is None:
+            latitude, longitude, radius = self.origin
+            hits = spatial.get_index().nearest(latitude, longitude, k=MAX_SPATIAL_RESULTS, radius_km=radius)
+            matching = set(self.queryset.filter(pk__in=[pk for pk, _ in hits]).values_list('pk', flat=True))
+            self._hits = [hit for hit in hits if hit[0] in matching]
+            if self.place:
+                self._hits = with_place_matches(self._hits, self.queryset, self.place, self.origin)
+        return self._hits
+
+    def page(self, number, per_page, fields=None):
+        """
+        A Paginator page of centers; location searches come nearest first with
+        ``distance_km`` set. ``fields`` limits the columns loaded to what those
+        API fields need.
+        """
+        queryset = self.queryset
+        if fields is not None:
+            queryset = queryset.only('pk', *{column for name in fields for column in FIELDS[name][0]})
+        if self.origin:
+            page = Paginator(self.hits, per_page).get_page(number)
+            page.object_list = spatial.fetch(queryset, page.object_list)
+            return page
+        return Paginator(queryset, per_page).get_page(number)
+
+    def etag(self):
+        """
+        Changes whenever a matching center is added, edited or removed, or the
+        query changes. "Open now" results also change with the clock.
+        """
+        state = self.queryset.aggregate(latest=Max('updated_at'), total=Count('pk'))
+        parts = [sorted(self.params.lists()), state['latest'], state['total']]
+        if self.params.get('open_now') == 'on':
+            parts.append(timezone.now().strftime('%Y%m%d%H%M'))
+        return hashlib.md5(repr(parts).encode('utf-8')).hexdigest()
@@ -0,0 +1,152 @@
+# centers/spatial.py
+# In-memory spatial index for "centers near me" queries.
+#
+# Centers are few and rarely edited, so each process keeps a k-d tree of all
+# geocoded centers and answers nearest/within-radius queries without touching
+# the database. Points are stored as unit vectors on the sphere: the straight
+# (chord) distance between two of them grows with the great-circle distance,
+# so the tree's plain Euclidean pruning gives exact geographic answers with no
+# special cases at the antimeridian.
+#
+# Saving or deleting a center bumps a version stamp in the Django cache; the
+# next query in any process sharing that cache sees the new stamp and rebuilds.
+# Bulk writes that bypass signals must call invalidate() themselves.
+
+import heapq
+import math
+import uuid
+from operator import itemgetter
+
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.geo import EARTH_RADIUS_KM
+from .models import RecyclingCenter
+
+VERSION_KEY = 'centers:spatial:version'
+
+_index = None
+_index_version = None
+
+
+def _unit(latitude, longitude):
+    lat, lon = math.radians(float(latitude)), math.radians(float(longitude))
+    return math.cos(lat) * math.cos(lon), math.cos(lat) * math.sin(lon), math.sin(lat)
+
+
+def _chord2(km):
+    """Squared chord length of an arc of ``km`` kilometres."""
+    angle = min(km / EARTH_RADIUS_KM, math.pi)
+    return (2 * math.sin(angle / 2)) ** 2
+
+
+def _km(chord2):
+    return 2 * EARTH_RADIUS_KM * math.asin(min(math.sqrt(chord2) / 2, 1.0))
+
+
+class CenterIndex:
+    """
+    Static 3-d tree over (pk, latitude, longitude) points. The tree lives in a
+    flat list: the node for a slice is its middle element, sorted on the
+    slice's split axis, with its two subtrees on either side.
+    """
+
+    def __init__(self, points):
+        self._nodes = [(*_unit(latitude, longitude), pk) for pk, latitude, longitude in points]
+        stack = [(0, len(self._nodes), 0)]
+        while stack:
+            lo, hi, axis = stack.pop()
+            if hi - lo < 2:
+                continue
+            self._nodes[lo:hi] = sorted(self._nodes[lo:hi], key=itemgetter(axis))
+            mid = (lo + hi) // 2
+            stack.append((lo, mid, (axis + 1) % 3))
+            stack.append((mid + 1, hi, (axis + 1) % 3))
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def _search(self, latitude, longitude, k, radius_km):
+        target = _unit(latitude, longitude)
+        tx, ty, tz = target
+        nodes = self._nodes
+        bound = _chord2(radius_km) if radius_km is not None else 4.0
+        best = []  # max-heap of (-chord2, pk) when k is set, plain list otherwise
+        stack = [(0, len(nodes), 0, 0.0)]
+        while stack:
+            lo, hi, axis, gap = stack.pop()
+            if lo >= hi or gap > bound:
+                continue
+            mid = (lo + hi) // 2
+            node = nodes[mid]
+            d2 = (node[0] - tx) ** 2 + (node[1] - ty) ** 2 + (node[2] - tz) ** 2
+            if d2 <= bound:
+                if k is None:
+                    best.append((d2, node[3]))
+                elif len(best) < k:
+                    heapq.heappush(best, (-d2, node[3]))
+                    if len(best) == k:
+                        bound = -best[0][0]
+                elif d2 < -best[0][0]:
+                    heapq.heapreplace(best, (-d2, node[3]))
+                    bound = -best[0][0]
+            diff = target[axis] - node[axis]
+            following = (axis + 1) % 3
+            if diff < 0:
+                stack.append((mid + 1, hi, following, diff * diff))
+                stack.append((lo, mid, following, 0.0))
+            else:
+                stack.append((lo, mid, following, diff * diff))
+                stack.append((mid + 1, hi, following, 0.0))
+        if k is not None:
+            best = [(-d2, pk) for d2, pk in best]
+        return [(pk, _km(d2)) for d2, pk in sorted(best)]
+
+    def nearest(self, latitude, longitude, k=10, radius_km=None):
+        """The ``k`` closest centers as [(pk, distance_km)], nearest first."""
+        if k <= 0:
+            return []
+        return self._search(latitude, longitude, k, radius_km)
+
+    def within(self, latitude, longitude, radius_km):
+        """Every center within ``radius_km`` as [(pk, distance_km)], nearest first."""
+        return self._search(latitude, longitude, None, radius_km)
+
+
+def invalidate():
+    cache.set(VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def get_index():
+    """The process-wide index, rebuilt if centers changed since it was built."""
+    global _index, _index_version
+    version = cache.get_or_set(VERSION_KEY, lambda: uuid.uuid4().hex, None)
+    if _index is None or version != _index_version:
+        points = (
+            RecyclingCenter.objects.filter(latitude__isnull=False, longitude__isnull=False)
+            .values_list('pk', 'latitude', 'longitude')
+        )
+        _index, _index_version = CenterIndex(points.iterator()), version
+    return _index
+
+
+def fetch(queryset, hits):
+    """
+    Centers from ``queryset`` for index hits, in hit order and annotated with
+    ``distance_km``. Hits filtered out by the queryset are dropped.
+    """
+    found = queryset.in_bulk([pk for pk, _ in hits])
+    centers = []
+    for pk, distance in hits:
+        center = found.get(pk)
+        if center is not None:
+            center.distance_km = distance
+            centers.append(center)
+    return centers
+
+
+@receiver(post_save, sender=RecyclingCenter)
+@receiver(post_delete, sender=RecyclingCenter)
+def centers_changed(sender, **kwargs):
+    invalidate()
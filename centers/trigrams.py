@@ -0,0 +1,98 @@
+# centers/trigrams.py
+# Typo-tolerant search over center name, city and address.
+#
+# Each center's text is broken into trigrams the way pg_trgm does it: every
+# word is padded with two leading spaces and one trailing space, so
+# "Mississauga" gives "  m", " mi", "mis", ..., "ga ". CenterTrigram keeps
+# one row per distinct trigram per center, indexed trigram-first. A query
+# matches centers sharing at least MIN_SIMILARITY of its trigrams and ranks
+# them by that share, so "Missisauga" still finds Mississauga (10 of 11) and
+# exact words rank first. Only rows for the query's trigrams are read; the
+# center table is never scanned.
+
+from collections import defaultdict
+
+from django.db import connection
+from django.db.models import Case, Count, IntegerField, Value, When
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from core.geo import normalize
+from .models import CenterTrigram, RecyclingCenter
+
+FIELDS = ['name', 'city', 'address']
+
+# Share of the query's trigrams a center must have to match
+MIN_SIMILARITY = 0.5
+
+# Best-ranked centers a search returns
+MAX_MATCHES = 1000
+
+
+def trigrams(text):
+    grams = set()
+    for word in normalize(text or '').split():
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def center_trigrams(center):
+    return trigrams(' '.join(getattr(center, field) for field in FIELDS))
+
+
+def refresh(centers):
+    """Rewrite the trigram rows of ``centers``."""
+    centers = list(centers)
+    CenterTrigram.objects.filter(center__in=[c.pk for c in centers]).delete()
+    # Dozens of two-column rows per center: executemany skips building model instances
+    table = connection.ops.quote_name(CenterTrigram._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {table} (trigram, center_id) VALUES (%s, %s)',
+            [(gram, center.pk) for center in centers for gram in center_trigrams(center)],
+        )
+
+
+def search(queryset, text):
+    """
+    Centers in ``queryset`` fuzzily matching ``text``, best first, annotated
+    with ``trigram_hits`` (how many of the query's trigrams they contain).
+
+    The ranking runs here, as one grouped read of the covering (trigram,
+    center) index; the returned queryset only carries the top MAX_MATCHES ids.
+    Filter ``queryset`` before calling this: the ranking then only counts the
+    centers it keeps, so the cap never drops a center the filters allow.
+    """
+    grams = trigrams(text)
+    if not grams:
+        return queryset.none()
+    needed = max(1, int(len(grams) * MIN_SIMILARITY + 0.5))
+    candidates = CenterTrigram.objects.filter(trigram__in=grams)
+    if queryset.query.has_filters():
+        candidates = candidates.filter(center__in=queryset.values('pk'))
+    ranked = (
+        candidates.values('center').annotate(hits=Count('pk')).filter(hits__gte=needed)
+        .order_by('-hits').values_list('center', 'hits')[:MAX_MATCHES]
+    )
+    by_hits = defaultdict(list)
+    for center_id, hits in ranked:
+        by_hits[hits].append(center_id)
+    if not by_hits:
+        return queryset.none()
+    # Scores are small integers, so the rank is a CASE with one IN list per score
+    return (
+        queryset.filter(pk__in=[pk for ids in by_hits.values() for pk in ids])
+        .annotate(trigram_hits=Case(
+            *[When(pk__in=ids, then=Value(hits)) for hits, ids in by_hits.items()],
+            default=Value(0), output_field=IntegerField(),
+        ))
+        .order_by('-trigram_hits', 'name')
+    )
+
+
+@receiver(post_save, sender=RecyclingCenter)
+def refresh_center_trigrams(sender, instance, update_fields=None, **kwargs):
+    if update_fields and not set(FIELDS) & set(update_fields):
+        return
+    refresh([instance])
@@ -9,5 +9,8 @@ app_name = 'centers'
 urlpatterns = [
     path('', views.RecyclingCenterListView.as_view(), name='center_list'),
     path('search/', views.center_search, name='center_search'),
+    path('nearest/', views.nearest_centers, name='nearest_centers'),
+    path('api/search/', views.center_search_api, name='center_search_api'),
+    path('clusters/', views.map_clusters, name='map_clusters'),
     path('<slug:slug>/', views.RecyclingCenterDetailView.as_view(), name='center_detail'),
 ]
\ No newline at end of file
@@ -1,10 +1,26 @@
+import json
+
 from django.shortcuts import render, get_object_or_404
-from django.db.models import Q
 from django.views.generic import ListView, DetailView
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.core.paginator import Paginator
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from core import refdata
 from .models import RecyclingCenter,CANADIAN_PROVINCES
+from . import clusters, hours, materials, spatial, trigrams
+from .search import (
+    DEFAULT_RADIUS_KM, MAX_RADIUS_KM, MAX_SPATIAL_RESULTS, CenterSearch, filter_open, get_origin, select_fields,
+    serialize, with_place_matches,
+)
+
+MAX_NEAREST = 50
+NEARBY_RADIUS_KM = 100
+
+# Centers per page on the HTML search page and (by default / at most) in the API
+SEARCH_PAGE_SIZE = 24
+API_PAGE_SIZE = 20
+MAX_API_PAGE_SIZE = 100
 
 
 class RecyclingCenterListView(LoginRequiredMixin, ListView):
@@ -17,17 +33,6 @@ class RecyclingCenterListView(LoginRequiredMixin, ListView):
     def get_queryset(self):
         queryset = RecyclingCenter.objects.all()
 
-        # Search by keyword (name, city, address)
-        search_query = self.request.GET.get('q', '')
-        if search_query:
-            queryset = queryset.filter(
-                Q(name__icontains=search_query) |
-                Q(city__icontains=search_query) |
-                Q(address__icontains=search_query) |
-                Q(state__icontains=search_query) |
-                Q(description__icontains=search_query)
-            )
-
         # Filter by city
         city = self.request.GET.get('city', '')
         if city:
@@ -52,6 +57,28 @@ class RecyclingCenterListView(LoginRequiredMixin, ListView):
         if self.request.GET.get('donations') == 'on':
             queryset = queryset.filter(accepts_donations=True)
 
+        # Filter by accepted materials (all of the selected ones)
+        queryset = materials.filter_accepting(queryset, self.request.GET.getlist('material'))
+
+        # Filter by opening hours (open now, or on a given day and time)
+        queryset = filter_open(queryset, self.request.GET)
+
+        # Search by keyword (name, city, address), typo-tolerant and best match
+        # first; after the filters, so the ranking only counts centers they keep
+        search_query = self.request.GET.get('q', '')
+        if search_query:
+            queryset = trigrams.search(queryset, search_query)
+
+        # Near a place, postal code or coordinates: nearest first, from the spatial index
+        origin = get_origin(self.request.GET)
+        if origin:
+            latitude, longitude, radius = origin
+            hits = spatial.get_index().nearest(latitude, longitude, k=MAX_SPATIAL_RESULTS, radius_km=radius)
+            near = self.request.GET.get('near', '')
+            if near:
+                hits = with_place_matches(hits, queryset, near, origin)
+            return spatial.fetch(queryset, hits)
+
         return queryset
 
     def get_context_data(self, **kwargs):
@@ -60,12 +87,22 @@ class RecyclingCenterListView(LoginRequiredMixin, ListView):
         context['selected_city'] = self.request.GET.get('city', '')
         context['selected_state'] = self.request.GET.get('state', '')
         context['selected_zipcode'] = self.request.GET.get('zipcode', '')
+        context['near_query'] = self.request.GET.get('near', '')
+        context['selected_radius'] = self.request.GET.get('radius', str(DEFAULT_RADIUS_KM))
+        context['radius_choices'] = [5, 10, 25, 50, 100, 250]
+        context['open_now'] = self.request.GET.get('open_now') == 'on'
+        context['day_choices'] = hours.DAY_CHOICES
+        context['selected_day'] = self.request.GET.get('open_day', '')
+        context['selected_time'] = self.request.GET.get('open_time', '')
+        params = self.request.GET.copy()
+        params.pop(self.page_kwarg, None)
+        context['pagination_query'] = params.urlencode()
         context['material_choices'] = RecyclingCenter.MATERIAL_CHOICES
+        context['selected_materials'] = self.request.GET.getlist('material')
         context['canadian_provinces'] = CANADIAN_PROVINCES
 
-        # Get unique cities for filters
-        all_centers = RecyclingCenter.objects.all()
-        context['cities'] = all_centers.values_list('city', flat=True).distinct().order_by('city')
+        # Unique cities for filters
+        context['cities'] = refdata.center_cities.get()
 
         return context
 
@@ -89,11 +126,18 @@ class RecyclingCenterDetailView(LoginRequiredMixin, DetailView):
             ('Saturday', self.object.saturday_hours),
             ('Sunday', self.object.sunday_hours),
         ]
+        context['is_open_now'] = hours.is_open(self.object)
 
-        # Get nearby centers (same city)
-        context['nearby_centers'] = RecyclingCenter.objects.filter(
-            city=self.object.city
-        ).exclude(id=self.object.id)[:3]
+        # Get nearby centers (closest by distance, or same city if this one isn't geocoded)
+        if self.object.latitude is not None and self.object.longitude is not None:
+            hits = spatial.get_index().nearest(self.object.latitude, self.object.longitude, k=4, radius_km=NEARBY_RADIUS_KM)
+            context['nearby_centers'] = spatial.fetch(
+                RecyclingCenter.objects.exclude(id=self.object.id), hits
+            )[:3]
+        else:
+            context['nearby_centers'] = RecyclingCenter.objects.filter(
+                city=self.object.city
+            ).exclude(id=self.object.id)[:3]
 
         return context
 
@@ -101,37 +145,118 @@ class RecyclingCenterDetailView(LoginRequiredMixin, DetailView):
 @login_required(login_url='accounts:login')
 def center_search(request):
     """Enhanced search view for recycling centers with state filter"""
-    query = request.GET.get('q', '')
-    location = request.GET.get('location', '')
-    state = request.GET.get('state', '')
+    search = CenterSearch(request.GET)
+    page = search.page(request.GET.get('page'), SEARCH_PAGE_SIZE)
 
-    centers = RecyclingCenter.objects.all()
+    params = request.GET.copy()
+    params.pop('page', None)
+    context = {
+        'centers': page.object_list,
+        'page_obj': page,
+        'is_paginated': page.has_other_pages(),
+        'pagination_query': params.urlencode(),
+        'query': request.GET.get('q', ''),
+        'location': request.GET.get('location', ''),
+        'selected_state': request.GET.get('state', ''),
+        'canadian_provinces': CANADIAN_PROVINCES,
+        'open_now': request.GET.get('open_now') == 'on',
+        'day_choices': hours.DAY_CHOICES,
+        'selected_day': request.GET.get('open_day', ''),
+        'selected_time': request.GET.get('open_time', ''),
+        'material_choices': RecyclingCenter.MATERIAL_CHOICES,
+        'selected_materials': request.GET.getlist('material'),
+    }
 
-    if query:
-        centers = centers.filter(
-            Q(name__icontains=query) |
-            Q(description__icontains=query) |
-            Q(city__icontains=query)
-        )
+    return render(request, 'centers/search_results.html', context)
 
-    if location:
-        centers = centers.filter(
-            Q(city__icontains=location) |
-            Q(zipcode__icontains=location)
-        )
 
-    if state:
-        # State is now stored as abbreviation, so direct match
-        centers = centers.filter(state=state.upper())
+@login_required(login_url='accounts:login')
+def center_search_api(request):
+    """
+    JSON version of center_search, streamed one center at a time. Takes the
+    same filters plus ?page=, ?page_size= (up to MAX_API_PAGE_SIZE) and
+    ?fields=name,city,... to pick the serialized fields. Responses carry an
+    ETag, so clients polling an unchanged search get a bodiless 304.
+    """
+    search = CenterSearch(request.GET)
+    etag = f'"{search.etag()}"'
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
 
-    #centers = centers.prefetch_related('materials')[:20]
+    try:
+        page_size = min(max(int(request.GET.get('page_size', API_PAGE_SIZE)), 1), MAX_API_PAGE_SIZE)
+    except ValueError:
+        page_size = API_PAGE_SIZE
+    fields = select_fields(request.GET.get('fields'), located=search.origin is not None)
+    page = search.page(request.GET.get('page'), page_size, fields=fields)
+
+    def stream():
+        dumps = json.JSONEncoder(separators=(',', ':')).encode
+        yield dumps({
+            'count': page.paginator.count,
+            'page': page.number,
+            'num_pages': page.paginator.num_pages,
+            'next': page.next_page_number() if page.has_next() else None,
+            'previous': page.previous_page_number() if page.has_previous() else None,
+        })[:-1] + ',"results":['
+        for index, center in enumerate(page.object_list):
+            yield (',' if index else '') + dumps(serialize(center, fields, request))
+        yield ']}'
+
+    response = StreamingHttpResponse(stream(), content_type='application/json')
+    response['ETag'] = etag
+    return response
 
-    context = {
-        'centers': centers,
-        'query': query,
-        'location': location,
-        'selected_state': state,
-        'canadian_provinces': CANADIAN_PROVINCES,
-    }
 
-    return render(request, 'centers/search_results.html', context)
\ No newline at end of file
+@login_required(login_url='accounts:login')
+def nearest_centers(request):
+    """
+    JSON: the centers closest to ?lat=&lon= (or ?near=<place or postal code>),
+    nearest first. ?k= caps the count (default 10) and ?radius= the distance.
+    """
+    origin = get_origin(request.GET, default_radius=MAX_RADIUS_KM)
+    if origin is None:
+        return JsonResponse({'error': 'Pass lat and lon, or near with a known place or postal code.'}, status=400)
+    try:
+        k = min(max(int(request.GET.get('k', 10)), 1), MAX_NEAREST)
+    except ValueError:
+        k = 10
+    latitude, longitude, radius = origin
+    hits = spatial.get_index().nearest(latitude, longitude, k=k, radius_km=radius)
+    centers = spatial.fetch(RecyclingCenter.objects.all(), hits)
+    fields = ['name', 'slug', 'url', 'address', 'latitude', 'longitude', 'distance_km']
+    return JsonResponse({
+        'origin': {'latitude': latitude, 'longitude': longitude, 'radius_km': radius},
+        'results': [serialize(center, fields, request) for center in centers],
+    })
+
+
+@login_required(login_url='accounts:login')
+def map_clusters(request):
+    """
+    JSON markers for map tile ?z=&x=&y=. Up to clusters.MAX_ZOOM these are
+    precomputed clusters (count and centroid); closer in, the tile's centers.
+    """
+    try:
+        zoom, x, y = int(request.GET['z']), int(request.GET['x']), int(request.GET['y'])
+    except (KeyError, ValueError):
+        return JsonResponse({'error': 'Pass the tile as z, x and y.'}, status=400)
+    if not (0 <= zoom <= 22 and 0 <= x < 1 << zoom and 0 <= y < 1 << zoom):
+        return JsonResponse({'error': 'No such tile.'}, status=400)
+
+    if zoom <= clusters.MAX_ZOOM:
+        markers = [
+            {'latitude': cluster.latitude, 'longitude': cluster.longitude, 'count': cluster.count}
+            for cluster in clusters.tile(zoom, x, y)
+        ]
+    else:
+        south, west, north, east = clusters.tile_bounds(zoom, x, y)
+        centers = RecyclingCenter.objects.filter(
+            latitude__gte=south, latitude__lt=north, longitude__gte=west, longitude__lt=east,
+        ).only('name', 'slug', 'latitude', 'longitude')
+        fields = ['name', 'slug', 'url', 'latitude', 'longitude']
+        markers = [dict(serialize(center, fields, request), count=1) for center in centers]
+    response = JsonResponse({'zoom': zoom, 'x': x, 'y': y, 'markers': markers})
+    response['Cache-Control'] = 'private, max-age=60'
+    return response
@@ -51,6 +51,7 @@ MIDDLEWARE = [
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'core.recent.RecentlyViewedMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
@@ -85,6 +86,19 @@ DATABASES = {
     }
 }
 
+# Shared by every worker process and management command, so the version
+# stamps that invalidate per-process indexes (core/refdata.py,
+# centers/spatial.py, tips/similarity.py) reach all of them. An evicted stamp
+# only causes a reload. Point this at Redis or Memcached when running on
+# more than one host.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'var' / 'cache',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -129,6 +143,18 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 LOGIN_URL = 'accounts:login'
 
+# Buffered counters (core/counters.py): page views are appended to a log in
+# COUNTER_LOG_DIR and written to the database in batches every
+# VIEW_COUNTER_FLUSH_INTERVAL seconds.
+COUNTER_LOG_DIR = BASE_DIR / 'var'
+VIEW_COUNTER_FLUSH_INTERVAL = 30
+
+# Worker processes rendering item image thumbnails (items/thumbnails.py)
+THUMBNAIL_WORKERS = 2
+
+# Seconds the item browser caches facet counts per filter set (items/facets.py)
+ITEM_FACET_CACHE_TIMEOUT = 60
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
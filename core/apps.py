@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        # Connects the signals that invalidate cached reference data and
+        # keep the site-wide totals current
+        from . import refdata, stats  # noqa: F401
@@ -0,0 +1,127 @@
+# core/counters.py
+# Buffered counters for hot write paths such as item and tip page views.
+#
+# Increments are appended to a small per-counter log file instead of hitting
+# the database on every request. The log is folded into batched
+# "UPDATE ... SET col = col + n" statements every VIEW_COUNTER_FLUSH_INTERVAL
+# seconds, or on demand with `manage.py flush_view_counts`. The log is only
+# truncated after the UPDATEs commit, so pending counts survive restarts.
+
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to the in-process lock only
+    fcntl = None
+
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+from . import trending
+
+logger = logging.getLogger(__name__)
+
+COUNTERS = {}
+
+
+class BufferedCounter:
+    def __init__(self, name, apply):
+        # apply(pending) receives a Counter of {key: increment} and writes it
+        self.name = name
+        self.apply = apply
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        COUNTERS[name] = self
+
+    @property
+    def path(self):
+        return Path(getattr(settings, 'COUNTER_LOG_DIR', settings.BASE_DIR / 'var')) / f'{self.name}.log'
+
+    @contextmanager
+    def _open_locked(self):
+        path = self.path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, open(path, 'a+', encoding='utf-8') as fh:
+            if fcntl:
+                fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield fh
+            finally:
+                if fcntl:
+                    fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def add(self, key, amount=1):
+        self.add_many([key], amount)
+
+    def add_many(self, keys, amount=1):
+        with self._open_locked() as fh:
+            fh.write(''.join(f'{key} {amount}\n' for key in keys))
+        self.maybe_flush()
+
+    def maybe_flush(self):
+        interval = getattr(settings, 'VIEW_COUNTER_FLUSH_INTERVAL', 30)
+        if time.monotonic() - self._last_flush < interval:
+            return
+        try:
+            self.flush()
+        except Exception:
+            # Counts stay in the log and are retried on the next flush
+            logger.exception('Flushing the %s counter failed', self.name)
+
+    def flush(self):
+        """Apply every pending increment. Returns the number of increments written."""
+        self._last_flush = time.monotonic()
+        with self._open_locked() as fh:
+            fh.seek(0)
+            pending = Counter()
+            for line in fh:
+                key, _, amount = line.strip().rpartition(' ')
+                try:
+                    pending[key] += int(amount)
+                except ValueError:
+                    continue  # torn write from a crashed process
+            pending.pop('', None)
+            if pending:
+                with transaction.atomic():
+                    self.apply(pending)
+            fh.truncate(0)
+        return sum(pending.values())
+
+
+def flush_all():
+    return {name: counter.flush() for name, counter in COUNTERS.items()}
+
+
+def _apply_view_counts(pending):
+    # {(model label, increment): [pks]} -> one UPDATE per model and increment
+    batches = defaultdict(list)
+    for key, amount in pending.items():
+        label, _, pk = key.partition(':')
+        if pk.isdigit():
+            batches[label, amount].append(int(pk))
+    for (label, amount), pks in batches.items():
+        try:
+            model = apps.get_model(label)
+        except (LookupError, ValueError):
+            logger.warning('Dropping view counts for unknown model %r', label)
+            continue
+        changes = {'views': F('views') + amount}
+        if trending.has_score(model):
+            changes['trending_score'] = trending.added(amount * trending.VIEW_WEIGHT)
+        for start in range(0, len(pks), 500):
+            model.objects.filter(pk__in=pks[start:start + 500]).update(**changes)
+
+
+view_counts = BufferedCounter('views', _apply_view_counts)
+
+
+def record_view(instance):
+    """Count one view of ``instance``; its ``views`` column catches up on the next flush."""
+    view_counts.add(f'{instance._meta.label_lower}:{instance.pk}')
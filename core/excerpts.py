@@ -0,0 +1,15 @@
+# core/excerpts.py
+# Short plain-text excerpts of long text fields, stored next to them so list
+# pages and cards can show a teaser without loading the full body.
+
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+# Longest teaser any card shows; templates truncate further as they need
+EXCERPT_WORDS = 30
+EXCERPT_LENGTH = 300
+
+
+def make_excerpt(text):
+    text = ' '.join(strip_tags(text or '').split())
+    return Truncator(Truncator(text).words(EXCERPT_WORDS)).chars(EXCERPT_LENGTH)
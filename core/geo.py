@@ -0,0 +1,162 @@
+# core/geo.py
+# Offline geocoding and grid helpers for Canadian locations.
+#
+# Free-text locations ("Oakville, ON", "M5V 2T6", "near Montréal") are resolved
+# against two bundled tables in core/data: a gazetteer of Canadian places and
+# postal-code prefix centroids (FSA district letter, refined by two-character
+# prefixes for the larger cities). No network service is involved.
+#
+# Coordinates are bucketed into a fixed grid of GRID_DEGREES cells so radius
+# queries can narrow candidates with an indexed `grid_cell IN (...)` before
+# computing distances.
+
+import csv
+import math
+import re
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+
+from django.db.models import FloatField
+from django.db.models.functions import Cast, Power, Sqrt
+
+DATA_DIR = Path(__file__).resolve().parent / 'data'
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.2
+
+GRID_DEGREES = 0.1
+GRID_COLUMNS = int(360 / GRID_DEGREES)
+
+MAX_RADIUS_KM = 100
+
+POSTAL_RE = re.compile(r'\b([ABCEGHJ-NPRSTVXY]\d[A-Z])\s?(\d[A-Z]\d)?\b')
+
+# Extra spellings people type for gazetteer entries
+ALIASES = {
+    'quebec': 'quebec city',
+    'ville de quebec': 'quebec city',
+    'kw': 'kitchener',
+    'the soo': 'sault ste marie',
+}
+
+
+def normalize(text):
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii').lower()
+    text = re.sub(r"['’`]", '', text)
+    text = re.sub(r'[^a-z0-9]+', ' ', text).strip()
+    return re.sub(r'\bsaint\b', 'st', text)
+
+
+@lru_cache(maxsize=None)
+def places():
+    """{normalized place name: (latitude, longitude, province)}."""
+    table = {}
+    with open(DATA_DIR / 'canada_places.csv', newline='', encoding='utf-8') as fh:
+        for row in csv.DictReader(fh):
+            table[normalize(row['name'])] = (float(row['latitude']), float(row['longitude']), row['province'])
+    for alias, name in ALIASES.items():
+        table[alias] = table[normalize(name)]
+    return table
+
+
+@lru_cache(maxsize=None)
+def postal_prefixes():
+    """{postal prefix (1-3 characters): (latitude, longitude)}."""
+    with open(DATA_DIR / 'postal_prefixes.csv', newline='', encoding='utf-8') as fh:
+        return {
+            row['prefix']: (float(row['latitude']), float(row['longitude']))
+            for row in csv.DictReader(fh)
+        }
+
+
+def geocode_postal(code, shortest=1):
+    """
+    Centroid of the longest known prefix (of at least ``shortest`` characters)
+    of a postal code or FSA, or None.
+    """
+    code = re.sub(r'\s+', '', (code or '').upper())
+    table = postal_prefixes()
+    for length in range(3, shortest - 1, -1):
+        if len(code) >= length and code[:length] in table:
+            return table[code[:length]]
+    return None
+
+
+def geocode(text):
+    """Resolve free text to (latitude, longitude), or None if nothing matches."""
+    if not text:
+        return None
+    postal = POSTAL_RE.search(text.upper())
+    if postal:
+        return geocode_postal(postal.group(1))
+
+    table = places()
+    words = normalize(text).split()
+    # Longest run of words that names a known place wins ("north vancouver" over "vancouver")
+    for size in range(min(len(words), 4), 0, -1):
+        for start in range(len(words) - size + 1):
+            match = table.get(' '.join(words[start:start + size]))
+            if match:
+                return match[0], match[1]
+    return None
+
+
+def geocode_address(postal_code, place):
+    """
+    Point for an address. A one-letter postal prefix only locates the province
+    or region, so the place name is preferred to it.
+    """
+    return geocode_postal(postal_code, shortest=2) or geocode(place) or geocode_postal(postal_code)
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def grid_cell(latitude, longitude):
+    if latitude is None or longitude is None:
+        return None
+    row = int(math.floor((float(latitude) + 90) / GRID_DEGREES))
+    column = int(math.floor((float(longitude) + 180) / GRID_DEGREES)) % GRID_COLUMNS
+    return row * GRID_COLUMNS + column
+
+
+def cells_within(latitude, longitude, radius_km):
+    """Every grid cell overlapping the bounding box of the circle."""
+    radius_km = min(radius_km, MAX_RADIUS_KM)
+    dlat = radius_km / KM_PER_DEGREE
+    dlon = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 0.01))
+    first_row = int(math.floor((latitude - dlat + 90) / GRID_DEGREES))
+    last_row = int(math.floor((latitude + dlat + 90) / GRID_DEGREES))
+    first_column = int(math.floor((longitude - dlon + 180) / GRID_DEGREES))
+    last_column = int(math.floor((longitude + dlon + 180) / GRID_DEGREES))
+    return [
+        row * GRID_COLUMNS + column % GRID_COLUMNS
+        for row in range(first_row, last_row + 1)
+        for column in range(first_column, last_column + 1)
+    ]
+
+
+def within_radius(queryset, latitude, longitude, radius_km):
+    """
+    Restrict a queryset of a model with latitude/longitude/grid_cell fields to
+    rows within ``radius_km``, nearest first, annotated with ``distance_km``.
+
+    The grid narrows candidates through the grid_cell index; the distance is
+    an equirectangular approximation, accurate to well under 1% at these ranges.
+    """
+    radius_km = min(radius_km, MAX_RADIUS_KM)
+    scale = math.cos(math.radians(latitude))
+    distance = Sqrt(
+        Power(Cast('latitude', FloatField()) - latitude, 2)
+        + Power((Cast('longitude', FloatField()) - longitude) * scale, 2)
+    ) * KM_PER_DEGREE
+    return (
+        queryset.filter(grid_cell__in=cells_within(latitude, longitude, radius_km))
+        .annotate(distance_km=distance)
+        .filter(distance_km__lte=radius_km)
+        .order_by('distance_km')
+    )
@@ -0,0 +1,66 @@
+# core/home.py
+# The home page's data, built at most once a minute and shared through the
+# Django cache.
+#
+# A cached bundle is served while fresh. Once it is older than FRESH_FOR,
+# the first request to claim the rebuild lock rebuilds it while every other
+# request keeps getting the stale copy, so a traffic spike never turns into
+# a wave of identical queries. Only a cold cache makes requests build it
+# themselves.
+
+import time
+
+from django.core.cache import cache
+
+from items.models import Item
+from tips import favorites
+from tips.models import RecyclingTip
+from . import refdata, stats
+
+BUNDLE_KEY = 'core:home:bundle'
+LOCK_KEY = 'core:home:rebuilding'
+FRESH_FOR = 60
+KEEP_FOR = 60 * 60
+LOCK_TIMEOUT = 30
+
+
+def build():
+    totals = stats.totals()
+    return {
+        'featured_items': list(
+            Item.objects.filter(status=Item.STATUS_AVAILABLE).select_related('primary_image').defer('description')[:3]
+        ),
+        'featured_tips': refdata.featured_tips.get(),
+        'recent_tips': list(
+            RecyclingTip.objects.select_related('category', 'author').defer('content').order_by('-created_at')[:3]
+        ),
+        'trending_tips': favorites.trending_tips(),
+        'trending_items': list(
+            Item.objects.filter(status=Item.STATUS_AVAILABLE, trending_score__gt=0)
+            .defer('description').order_by('-trending_score')[:5]
+        ),
+        'item_categories': totals['item_categories'],
+        'total_items': totals['available_items'],
+        'total_tips': totals['tips'],
+        'total_centers': totals['centers'],
+    }
+
+
+def get_bundle():
+    cached = cache.get(BUNDLE_KEY)
+    now = time.time()
+    if cached and now - cached['built_at'] < FRESH_FOR:
+        return cached['data']
+    # A cold cache has no stale copy to serve, so nobody waits for the lock
+    locked = bool(cached) and cache.add(LOCK_KEY, True, LOCK_TIMEOUT)
+    if cached and not locked:
+        # Someone else is rebuilding it
+        return cached['data']
+    try:
+        data = build()
+        cache.set(BUNDLE_KEY, {'built_at': now, 'data': data}, KEEP_FOR)
+    finally:
+        # Only the request that took the lock releases it
+        if locked:
+            cache.delete(LOCK_KEY)
+    return data
@@ -0,0 +1,90 @@
+import random
+import time
+import tracemalloc
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.template import engines
+
+from items.models import Item
+from tips.models import RecyclingTip
+
+WORDS = (
+    'rinse plastic bottles before recycling remove caps and labels where possible glass jars '
+    'compost kitchen scraps cardboard boxes flatten batteries electronics drop off depot'
+).split()
+
+# The card markup before and after excerpts, reduced to the teaser
+BEFORE = {'tips': '{% for o in rows %}{{ o.content|striptags|truncatewords:20 }}{% endfor %}',
+          'items': '{% for o in rows %}{{ o.description|truncatewords:15 }}{% endfor %}'}
+AFTER = {'tips': '{% for o in rows %}{{ o.excerpt|truncatewords:20 }}{% endfor %}',
+         'items': '{% for o in rows %}{{ o.excerpt|truncatewords:15 }}{% endfor %}'}
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare list-page cards that load full tip/item bodies with cards built from stored '
+        'excerpts, on long-form synthetic content. Works inside a transaction that is always '
+        'rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=200)
+        parser.add_argument('--words', type=int, default=3000, help='Length of each body, in words.')
+        parser.add_argument('--page-size', type=int, default=12)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, options):
+        rng = random.Random(options['rows'])
+        user = User.objects.create_user(username='bench-card-excerpts')
+
+        def body():
+            return ' '.join(rng.choice(WORDS) for _ in range(options['words']))
+
+        # save() computes the excerpts
+        for n in range(options['rows']):
+            RecyclingTip.objects.create(title=f'Bench tip {n}', content=body(), author=user)
+            Item.objects.create(title=f'Bench item {n}', description=body(), owner=user)
+
+        page = options['page_size']
+        tips = RecyclingTip.objects.filter(author=user).select_related('category', 'author')
+        items = Item.objects.filter(owner=user).select_related('category', 'owner', 'primary_image')
+        self.stdout.write(f"{options['rows']} tips and items of {options['words']} words, {page} cards per page")
+        self.stdout.write(f"{'':24}{'ms/page':>10}{'KB fetched':>12}{'peak KB':>10}")
+        for label, queryset, body_field in (('tips', tips, 'content'), ('items', items, 'description')):
+            self.report(f'{label}: full body', queryset[:page], BEFORE[label], options['repeat'])
+            self.report(f'{label}: excerpt', queryset.defer(body_field)[:page], AFTER[label], options['repeat'])
+
+    def report(self, label, queryset, markup, repeat):
+        template = engines['django'].from_string(markup)
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            template.render({'rows': list(queryset.all())})
+            timings.append((time.perf_counter() - started) * 1000)
+
+        tracemalloc.start()
+        rows = list(queryset.all())
+        template.render({'rows': rows})
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        deferred = rows[0].get_deferred_fields() if rows else set()
+        fetched = sum(
+            len(str(getattr(row, field.attname) or ''))
+            for row in rows for field in row._meta.concrete_fields if field.attname not in deferred
+        )
+        self.stdout.write(f'{label:24}{min(timings):>10.2f}{fetched / 1024:>12.1f}{peak / 1024:>10.1f}')
@@ -0,0 +1,67 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from core.slugs import allocate_slug, allocate_slugs
+from items.models import Category
+
+
+class Rollback(Exception):
+    pass
+
+
+def probe_loop(model, base):
+    # The allocation strategy the models used before core.slugs
+    slug = base
+    counter = 1
+    while model.objects.filter(slug=slug).exists():
+        slug = f"{base}-{counter}"
+        counter += 1
+    return slug
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare per-collision probing with core.slugs as collisions grow. '
+        'Works inside a transaction that is always rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--collisions', type=int, nargs='+', default=[10, 100, 1000, 10000])
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options['collisions'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, sizes):
+        created = 0
+        self.stdout.write(f"{'collisions':>10}  {'probe loop':>22}  {'allocate_slug':>22}  {'allocate_slugs x100':>22}")
+        for size in sorted(sizes):
+            Category.objects.bulk_create(
+                Category(name=f'bench-{n}', slug='bench-chair' if n == 0 else f'bench-chair-{n}')
+                for n in range(created, size)
+            )
+            created = max(created, size)
+            loop = self.measure(lambda: probe_loop(Category, 'bench-chair'))
+            single = self.measure(lambda: allocate_slug(Category, 'bench-chair'))
+            batch = self.measure(lambda: allocate_slugs(Category, ['bench-chair'] * 100))
+            self.stdout.write(f'{size:>10}  {loop:>22}  {single:>22}  {batch:>22}')
+
+    def measure(self, allocate):
+        queries = 0
+
+        def count(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count):
+            started = time.perf_counter()
+            allocate()
+            elapsed = time.perf_counter() - started
+        return f'{elapsed * 1000:8.2f} ms / {queries:>5} q'
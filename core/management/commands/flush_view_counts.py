@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core import counters
+
+
+class Command(BaseCommand):
+    help = 'Write all buffered counter increments (page views, item co-views) to the database now.'
+
+    def handle(self, *args, **options):
+        for name, written in counters.flush_all().items():
+            self.stdout.write(self.style.SUCCESS(f'{name}: flushed {written} increments'))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from core import stats
+
+
+class Command(BaseCommand):
+    help = 'Recount the site-wide totals shown on the home page (run periodically to repair drift).'
+
+    def handle(self, *args, **options):
+        stats.refresh()
+        for name, value in sorted(stats.totals().items()):
+            self.stdout.write(self.style.SUCCESS(f'{name}: {value}'))
@@ -1,3 +1,11 @@
 from django.db import models
 
-# Create your models here.
+
+class SiteStat(models.Model):
+    """A materialised site-wide total shown on the home page; see core.stats."""
+    name = models.CharField(max_length=50, primary_key=True)
+    value = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name}: {self.value}"
@@ -0,0 +1,138 @@
+# core/pagination.py
+# Keyset (cursor) pagination for listings ordered newest first.
+#
+# Instead of OFFSET n plus a COUNT(*) of the whole filtered set, each page
+# asks for rows strictly after the last (created_at, id) pair it showed, so
+# deep pages cost the same as the first one. Cursors are signed, opaque
+# tokens carrying that pair and the direction of travel.
+
+from datetime import datetime
+
+from django.core import signing
+from django.db.models import Q
+
+CURSOR_SALT = 'core.pagination.cursor'
+
+
+class CursorPage:
+    def __init__(self, object_list, next_cursor, previous_cursor, total=None, total_is_exact=True):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.approximate_total = total
+        self.total_is_exact = total_is_exact
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Paginate a queryset on (created_at, id), newest first."""
+
+    def __init__(self, queryset, per_page, total_cap=None):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.total_cap = total_cap
+
+    @staticmethod
+    def supports(queryset):
+        ordering = tuple(queryset.query.order_by) or tuple(queryset.model._meta.ordering)
+        return not queryset.query.extra_order_by and ordering in (('-created_at',), ('-created_at', '-id'))
+
+    @staticmethod
+    def encode(obj, direction):
+        return signing.dumps([obj.created_at.isoformat(), obj.pk, direction], salt=CURSOR_SALT, compress=True)
+
+    @staticmethod
+    def decode(cursor):
+        try:
+            created_at, pk, direction = signing.loads(cursor, salt=CURSOR_SALT)
+            return datetime.fromisoformat(created_at), int(pk), direction
+        except (signing.BadSignature, TypeError, ValueError):
+            return None
+
+    def page(self, cursor=None):
+        position = self.decode(cursor) if cursor else None
+        queryset = self.queryset
+        backwards = False
+        if position:
+            created_at, pk, direction = position
+            backwards = direction == 'prev'
+            if backwards:
+                queryset = queryset.filter(
+                    Q(created_at__gt=created_at) | Q(created_at=created_at, pk__gt=pk)
+                ).order_by('created_at', 'id')
+            else:
+                queryset = queryset.filter(
+                    Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk)
+                ).order_by('-created_at', '-id')
+        else:
+            queryset = queryset.order_by('-created_at', '-id')
+
+        # One extra row tells us whether there is another page in this direction
+        rows = list(queryset[:self.per_page + 1])
+        more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+
+        next_cursor = previous_cursor = None
+        if rows:
+            if more or backwards:
+                next_cursor = self.encode(rows[-1], 'next')
+            if position and (more or not backwards):
+                previous_cursor = self.encode(rows[0], 'prev')
+
+        total, exact = (None, True)
+        if self.total_cap is not None and not position and not more:
+            # The whole result fits on the first page: no need to count it
+            total = len(rows)
+        elif self.total_cap is not None:
+            total, exact = approximate_count(self.queryset, self.total_cap)
+        return CursorPage(rows, next_cursor, previous_cursor, total, exact)
+
+
+def approximate_count(queryset, cap):
+    """Count at most ``cap`` rows; returns (count, is_exact)."""
+    count = queryset.order_by()[:cap + 1].count()
+    if count > cap:
+        return cap, False
+    return count, True
+
+
+class CursorPaginationMixin:
+    """
+    ListView mixin that serves cursor pages when the queryset is ordered
+    newest first. Legacy ?page=N links and other orderings (e.g. ranked
+    search results) keep using Django's offset paginator.
+    """
+    cursor_kwarg = 'cursor'
+    approximate_total_cap = 1000
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.page_kwarg in self.request.GET or not CursorPaginator.supports(queryset):
+            return super().paginate_queryset(queryset, page_size)
+        paginator = CursorPaginator(queryset, page_size, total_cap=self.approximate_total_cap)
+        page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['cursor_pagination'] = isinstance(context.get('page_obj'), CursorPage)
+        params = self.request.GET.copy()
+        params.pop(self.cursor_kwarg, None)
+        params.pop(self.page_kwarg, None)
+        context['pagination_query'] = params.urlencode()
+        return context
@@ -0,0 +1,70 @@
+# core/recent.py
+# "Recently viewed" lists kept in a signed cookie instead of the session.
+#
+# Writing a list into the session on every page view turns each read into a
+# django_session UPDATE (and an INSERT for every new anonymous visitor). A
+# cookie per list holds the ids instead, most recent first, as "12.7.31",
+# signed so it can't be forged. Views read and update the list through
+# recent.get(request, name); RecentlyViewedMiddleware writes the cookies of
+# lists that changed onto the response. Nothing touches the database.
+
+from django.conf import settings
+
+COOKIE_PREFIX = 'recent_'
+COOKIE_AGE = 60 * 60 * 24 * 30
+SALT = 'core.recent'
+
+
+class RecentlyViewed:
+    def __init__(self, request, name, size):
+        self.cookie = COOKIE_PREFIX + name
+        self.size = size
+        self.modified = False
+        value = request.get_signed_cookie(self.cookie, default='', salt=SALT)
+        self.ids = [int(pk) for pk in value.split('.') if pk.isdigit()][:size]
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def __bool__(self):
+        return bool(self.ids)
+
+    def add(self, pk):
+        """Move ``pk`` to the front of the list."""
+        ids = [pk] + [other for other in self.ids if other != pk]
+        ids = ids[:self.size]
+        if ids != self.ids:
+            self.ids, self.modified = ids, True
+
+    def clear(self):
+        if self.ids:
+            self.ids, self.modified = [], True
+
+    def save(self, response):
+        if not self.ids:
+            response.delete_cookie(self.cookie, samesite='Lax')
+            return
+        response.set_signed_cookie(
+            self.cookie, '.'.join(map(str, self.ids)), salt=SALT, max_age=COOKIE_AGE,
+            secure=settings.SESSION_COOKIE_SECURE, httponly=True, samesite='Lax',
+        )
+
+
+def get(request, name, size=10):
+    """The request's ``name`` list, loaded from its cookie on first use."""
+    lists = request.__dict__.setdefault('_recently_viewed', {})
+    if name not in lists:
+        lists[name] = RecentlyViewed(request, name, size)
+    return lists[name]
+
+
+class RecentlyViewedMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        for recent in getattr(request, '_recently_viewed', {}).values():
+            if recent.modified:
+                recent.save(response)
+        return response
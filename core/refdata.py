@@ -0,0 +1,88 @@
+# core/refdata.py
+# Cached reference data: small, rarely edited lists that list pages show on
+# every request (item categories, tip categories, center cities, featured
+# tips).
+#
+# Each dataset is loaded once per process and kept until it goes stale. A
+# version stamp per dataset lives in the Django cache; saving or deleting a
+# row of a model the dataset is built from replaces the stamp, and the next
+# read in any process sharing that cache sees the new stamp and reloads.
+# Bulk writes that bypass signals must call invalidate() themselves.
+
+import threading
+import uuid
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+
+DATASETS = {}
+
+
+class ReferenceData:
+    def __init__(self, name, load, senders, fields=None):
+        # load() returns the dataset; a save of a ``senders`` model only
+        # invalidates it when update_fields touches ``fields`` (if given)
+        self.name = name
+        self.load = load
+        self.fields = set(fields or ())
+        self._value = None
+        self._version = None
+        self._lock = threading.Lock()
+        for sender in senders:
+            uid = f'refdata:{name}:{sender}'
+            post_save.connect(self._saved, sender=sender, weak=False, dispatch_uid=uid)
+            post_delete.connect(self._deleted, sender=sender, weak=False, dispatch_uid=uid)
+        DATASETS[name] = self
+
+    @property
+    def version_key(self):
+        return f'refdata:{self.name}:version'
+
+    def get(self):
+        """The dataset, reloaded if it changed since this process loaded it."""
+        version = cache.get_or_set(self.version_key, lambda: uuid.uuid4().hex, None)
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    # The stamp is read before loading, so a change made
+                    # meanwhile still triggers another reload
+                    self._value, self._version = self.load(), version
+        return self._value
+
+    def invalidate(self):
+        cache.set(self.version_key, uuid.uuid4().hex, None)
+
+    def _saved(self, sender, update_fields=None, **kwargs):
+        if self.fields and update_fields and not self.fields & set(update_fields):
+            return
+        self.invalidate()
+
+    def _deleted(self, sender, **kwargs):
+        self.invalidate()
+
+
+def _item_categories():
+    return list(apps.get_model('items', 'Category').objects.all())
+
+
+def _tip_categories():
+    return list(apps.get_model('tips', 'TipCategory').objects.all())
+
+
+def _featured_tips():
+    return list(apps.get_model('tips', 'RecyclingTip').objects.filter(is_featured=True).defer('content')[:3])
+
+
+def _center_cities():
+    centers = apps.get_model('centers', 'RecyclingCenter').objects.order_by('city')
+    return list(centers.values_list('city', flat=True).distinct())
+
+
+item_categories = ReferenceData('item_categories', _item_categories, ['items.Category'])
+tip_categories = ReferenceData('tip_categories', _tip_categories, ['tips.TipCategory'])
+featured_tips = ReferenceData(
+    'featured_tips', _featured_tips, ['tips.RecyclingTip'],
+    fields=['title', 'slug', 'excerpt', 'image', 'is_featured', 'created_at'],
+)
+center_cities = ReferenceData('center_cities', _center_cities, ['centers.RecyclingCenter'], fields=['city'])
@@ -0,0 +1,97 @@
+# core/slugs.py
+# Unique slug allocation shared by Item, RecyclingTip and RecyclingCenter.
+#
+# Collisions get a numeric suffix ("chair", "chair-1", "chair-2", ...). The
+# next free suffix is found with a single aggregate over the slug index range
+# that can contain collisions, instead of probing one candidate per query.
+
+import re
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, IntegerField, Max, Q
+from django.db.models.functions import Cast, Substr
+
+# Room kept at the end of the field for "-<counter>"
+SUFFIX_ROOM = 10
+
+# Bases per query in batch mode, well under SQLite's bound-parameter limit
+BATCH_CHUNK = 200
+
+
+def _fit(model, base, field):
+    max_length = model._meta.get_field(field).max_length
+    base = base[:max_length - SUFFIX_ROOM].strip('-')
+    return base or model._meta.model_name
+
+
+def _collision_range(base, field):
+    # "<base>" and every "<base>-..." slug sort in [<base>, <base>.): '-' is the
+    # only slug character below '.'. So this is an index range scan, not a LIKE.
+    return Q(**{f'{field}__gte': base, f'{field}__lt': f'{base}.'})
+
+
+def allocate_slug(model, base, field='slug'):
+    """Return a free slug for ``model`` derived from ``base``, using one query."""
+    base = _fit(model, base, field)
+    queryset = model._default_manager.filter(_collision_range(base, field))
+    numbered = Q(**{f'{field}__regex': rf'^{re.escape(base)}-[0-9]+$'})
+    found = queryset.aggregate(
+        taken=Count('pk', filter=Q(**{field: base})),
+        top=Max(Cast(Substr(field, len(base) + 2), IntegerField()), filter=numbered),
+    )
+    if not found['taken']:
+        return base
+    return f"{base}-{(found['top'] or 0) + 1}"
+
+
+def allocate_slugs(model, bases, field='slug'):
+    """
+    Batch mode for bulk inserts: one free slug per entry of ``bases``, unique
+    among themselves too. Costs one query per BATCH_CHUNK distinct bases.
+    """
+    bases = [_fit(model, base, field) for base in bases]
+    distinct = list(dict.fromkeys(bases))
+    taken = set()
+    top = defaultdict(int)
+    for start in range(0, len(distinct), BATCH_CHUNK):
+        chunk = distinct[start:start + BATCH_CHUNK]
+        condition = Q(*(_collision_range(base, field) for base in chunk), _connector=Q.OR)
+        for slug in model._default_manager.filter(condition).order_by().values_list(field, flat=True):
+            taken.add(slug)
+            head, _, suffix = slug.rpartition('-')
+            if suffix.isdigit():
+                top[head] = max(top[head], int(suffix))
+
+    slugs = []
+    for base in bases:
+        slug = base
+        while slug in taken:
+            # A base may itself look numbered ("chair-1"), so the suffix can
+            # already be taken by an earlier entry of this batch
+            top[base] += 1
+            slug = f'{base}-{top[base]}'
+        taken.add(slug)
+        head, _, suffix = slug.rpartition('-')
+        if suffix.isdigit():
+            top[head] = max(top[head], int(suffix))
+        slugs.append(slug)
+    return slugs
+
+
+def save_with_unique_slug(instance, base, save, *args, field='slug', attempts=5, **kwargs):
+    """
+    Allocate a slug for ``instance`` and call ``save``. If a concurrent
+    insert grabbed the same slug first, allocate again and retry.
+    """
+    model = type(instance)
+    for attempt in range(attempts):
+        slug = allocate_slug(model, base, field)
+        setattr(instance, field, slug)
+        try:
+            with transaction.atomic():
+                return save(*args, **kwargs)
+        except IntegrityError:
+            lost_race = model._default_manager.filter(**{field: slug}).exclude(pk=instance.pk).exists()
+            if not lost_race or attempt == attempts - 1:
+                raise
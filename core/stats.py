@@ -0,0 +1,72 @@
+# core/stats.py
+# Site-wide totals (items, tips, centers, categories) for the home page.
+#
+# Counting whole tables on every landing-page hit is wasteful, so each total
+# is stored as a SiteStat row. Saving or deleting a counted model recounts
+# just the totals it affects, which is cheap next to the reads it saves:
+# writes are rare and go through indexes. Bulk loaders that bypass signals
+# call refresh() when they finish, and `manage.py refresh_site_stats` can
+# run periodically as a safety net.
+
+from django.apps import apps
+from django.db.models.signals import post_delete, post_save
+
+from .models import SiteStat
+
+
+def _item_categories():
+    return apps.get_model('items', 'Category').objects.all()
+
+
+def _available_items():
+    Item = apps.get_model('items', 'Item')
+    return Item.objects.filter(status=Item.STATUS_AVAILABLE)
+
+
+def _tips():
+    return apps.get_model('tips', 'RecyclingTip').objects.all()
+
+
+def _centers():
+    return apps.get_model('centers', 'RecyclingCenter').objects.all()
+
+
+# name -> (model, fields that move the total when changed, rows counted)
+STATS = {
+    'item_categories': ('items.Category', set(), _item_categories),
+    'available_items': ('items.Item', {'status'}, _available_items),
+    'tips': ('tips.RecyclingTip', set(), _tips),
+    'centers': ('centers.RecyclingCenter', set(), _centers),
+}
+
+
+def refresh(*names):
+    """Recount the named totals (default: all of them)."""
+    for name in names or STATS:
+        SiteStat.objects.update_or_create(name=name, defaults={'value': STATS[name][2]().count()})
+
+
+def totals():
+    """{name: value} of every total, counting any that was never stored."""
+    values = dict(SiteStat.objects.values_list('name', 'value'))
+    missing = [name for name in STATS if name not in values]
+    if missing:
+        refresh(*missing)
+        values.update(SiteStat.objects.filter(name__in=missing).values_list('name', 'value'))
+    return values
+
+
+def _connect(name, label, fields):
+    def saved(sender, created=False, update_fields=None, **kwargs):
+        if created or update_fields is None or fields & set(update_fields):
+            refresh(name)
+
+    def deleted(sender, **kwargs):
+        refresh(name)
+
+    post_save.connect(saved, sender=label, weak=False, dispatch_uid=f'stats:{name}')
+    post_delete.connect(deleted, sender=label, weak=False, dispatch_uid=f'stats:{name}')
+
+
+for _name, (_label, _fields, _) in STATS.items():
+    _connect(_name, _label, _fields)
@@ -0,0 +1,65 @@
+# core/trending.py
+# "Trending" scores with exponential time decay, kept incrementally.
+#
+# A tip's or item's trending score is the sum of its events (views,
+# favorites), each weighted by 2^(-age / HALF_LIFE), so a view from a week
+# ago counts half as much as one now. Decaying every stored score as time
+# passes would mean rewriting the whole table; instead each event is stored
+# already scaled by 2^((t - EPOCH) / HALF_LIFE). All scores then share the
+# same pending decay factor, so ordering by the stored column is ordering by
+# the decayed score, and an event is one "score = score + w" in an UPDATE.
+#
+# Stored values double every half-life, so doubles overflow about 1000
+# half-lives (~19 years) after EPOCH. Moving EPOCH forward before then only
+# needs every score divided by the same factor. decayed() gives the score
+# as it stands now.
+
+from datetime import datetime, timezone as dt_timezone
+
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+EPOCH = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+HALF_LIFE_SECONDS = 7 * 24 * 3600
+
+VIEW_WEIGHT = 1.0
+FAVORITE_WEIGHT = 5.0
+
+
+def boost(moment=None):
+    """How much an event at ``moment`` (default: now) is scaled by when stored."""
+    moment = moment or timezone.now()
+    return 2.0 ** ((moment - EPOCH).total_seconds() / HALF_LIFE_SECONDS)
+
+
+def decayed(score, moment=None):
+    """A stored score as it stands at ``moment`` (default: now)."""
+    return score / boost(moment)
+
+
+def added(weight):
+    """UPDATE expression recording ``weight`` worth of events now."""
+    return F('trending_score') + weight * boost()
+
+
+def removed(weight, moment):
+    """
+    UPDATE expression taking back ``weight`` worth of events recorded at
+    ``moment`` (e.g. a favorite being removed), never below zero.
+    """
+    return Greatest(F('trending_score') - weight * boost(moment), Value(0.0))
+
+
+def seed(views, created_at, favorited_at=()):
+    """
+    Starting score for existing rows: their views, counted as if made when
+    they were posted, plus each favorite at the time it was made (so removing
+    one later takes back exactly what it added).
+    """
+    favorites = sum(FAVORITE_WEIGHT * boost(moment) for moment in favorited_at)
+    return views * VIEW_WEIGHT * boost(created_at) + favorites
+
+
+def has_score(model):
+    return any(field.name == 'trending_score' for field in model._meta.concrete_fields)
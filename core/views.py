@@ -1,23 +1,12 @@
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
-from items.models import Item, Category
-from centers.models import RecyclingCenter
+from items.models import Item
 from tips.models import RecyclingTip, FavoriteTip
+from .home import get_bundle
 
 def home(request):
-    featured_items = Item.objects.filter(status=Item.STATUS_AVAILABLE)[:3]
-    featured_tips = RecyclingTip.objects.filter(is_featured=True)[:3]
-    recent_tips = RecyclingTip.objects.all().order_by('-created_at')[:3]
-    context = {
-        'featured_items': featured_items,
-        'featured_tips': featured_tips,
-        'recent_tips': recent_tips,
-        'item_categories': Category.objects.count(),
-        'total_items': Item.objects.filter(status=Item.STATUS_AVAILABLE).count(),
-        'total_tips': RecyclingTip.objects.count(),
-        'total_centers': RecyclingCenter.objects.count(),
-    }
-    return render(request, 'core/home.html', context)
+    # Built at most once a minute and shared by every visitor; see core.home
+    return render(request, 'core/home.html', dict(get_bundle()))
 
 @login_required 
 def dashboard(request):    
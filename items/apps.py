@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ItemsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'items'
+
+    def ready(self):
+        # Registers the co-view counter so flush_view_counts picks it up
+        from . import related  # noqa: F401
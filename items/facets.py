@@ -0,0 +1,84 @@
+# items/facets.py
+# Sidebar facet counts (category, condition, free/trade) for the item browser.
+#
+# All three facets come from one GROUP BY over the searched listing set. Each
+# facet ignores its own selection and honours the other two, so picking
+# "Furniture" still shows how many items every other category would give.
+
+import hashlib
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+
+from .models import Item
+
+TYPE_CHOICES = [('free', 'Free'), ('trade', 'Trade')]
+
+
+def normalize_filters(search='', category='', condition='', item_type='', near=None):
+    return (
+        ' '.join(search.lower().split()),
+        category or '',
+        condition if condition in dict(Item.CONDITION_CHOICES) else '',
+        item_type if item_type in dict(TYPE_CHOICES) else '',
+        near,
+    )
+
+
+def cache_key(filters):
+    digest = hashlib.md5(repr(filters).encode('utf-8')).hexdigest()
+    return f'items:facets:{digest}'
+
+
+def count_facets(queryset, category='', condition='', item_type=''):
+    """Return {'category': Counter, 'condition': Counter, 'type': Counter} for ``queryset``."""
+    rows = (
+        queryset.order_by()
+        .values_list('category__slug', 'condition', 'is_free')
+        .annotate(total=Count('pk'))
+    )
+    counts = {'category': Counter(), 'condition': Counter(), 'type': Counter()}
+    for slug, item_condition, is_free, total in rows:
+        kind = 'free' if is_free else 'trade'
+        in_category = not category or slug == category
+        in_condition = not condition or item_condition == condition
+        in_type = not item_type or kind == item_type
+        if in_condition and in_type:
+            counts['category'][slug] += total
+        if in_category and in_type:
+            counts['condition'][item_condition] += total
+        if in_category and in_condition:
+            counts['type'][kind] += total
+    return counts
+
+
+def get_facets(queryset, categories, search='', category='', condition='', item_type='', near=None):
+    """
+    Facet options with counts, cached for ITEM_FACET_CACHE_TIMEOUT seconds
+    per normalized filter set. ``queryset`` must be the searched listing set
+    before category/condition/type filters are applied; ``near`` is the
+    (latitude, longitude, radius_km) it was restricted to, if any.
+    """
+    filters = normalize_filters(search, category, condition, item_type, near)
+    key = cache_key(filters)
+    counts = cache.get(key)
+    if counts is None:
+        counts = count_facets(queryset, *filters[1:4])
+        cache.set(key, counts, getattr(settings, 'ITEM_FACET_CACHE_TIMEOUT', 60))
+
+    return {
+        'category': [
+            {'value': c.slug, 'label': c.name, 'count': counts['category'].get(c.slug, 0)}
+            for c in categories
+        ],
+        'condition': [
+            {'value': value, 'label': label, 'count': counts['condition'].get(value, 0)}
+            for value, label in Item.CONDITION_CHOICES
+        ],
+        'type': [
+            {'value': value, 'label': label, 'count': counts['type'].get(value, 0)}
+            for value, label in TYPE_CHOICES
+        ],
+    }
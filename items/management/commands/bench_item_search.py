@@ -0,0 +1,105 @@
+import itertools
+import random
+import sqlite3
+import time
+
+from django.core.management.base import BaseCommand
+
+from items import search
+
+WORDS = (
+    'chair table lamp sofa bike helmet stroller crib desk shelf monitor laptop '
+    'kettle blender toaster jacket boots skates books puzzle guitar drum tent '
+    'wooden metal vintage modern small large blue red green white black oak '
+    'gently used barely working clean spare extra kids adult garden kitchen'
+).split()
+CITIES = ['Toronto', 'Mississauga', 'Brampton', 'Ottawa', 'Hamilton', 'Windsor', 'Waterloo', 'Kitchener']
+QUERIES = ['chair', 'vintage lamp', 'bik', 'oak desk toronto', 'guitar']
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the icontains scan with the FTS5 index on synthetic item tables. '
+        'Runs against a scratch in-memory SQLite database, never the project database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000])
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        for size in options['sizes']:
+            self.run_size(size, options['repeat'])
+
+    def run_size(self, size, repeat):
+        rng = random.Random(size)
+        db = sqlite3.connect(':memory:')
+        db.execute(
+            'CREATE TABLE items_item (id INTEGER PRIMARY KEY, title TEXT, description TEXT, '
+            'location TEXT, status TEXT, created_at INTEGER)'
+        )
+        db.execute(
+            f"CREATE VIRTUAL TABLE {search.FTS_TABLE} USING fts5(title, description, location, "
+            "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+        )
+
+        # Listing text follows a long-tail vocabulary like real descriptions do,
+        # so a search term matches a small slice of the table.
+        filler = [
+            ''.join(rng.choices('abcdefghijklmnopqrstuvwxyz', k=rng.randint(4, 9)))
+            for _ in range(20_000)
+        ]
+        vocabulary = WORDS + filler
+        weights = [1.0 / rank for rank in range(1, len(vocabulary) + 1)]
+        rng.shuffle(weights)
+        cum_weights = list(itertools.accumulate(weights))
+
+        def rows():
+            for pk in range(1, size + 1):
+                yield (
+                    pk,
+                    ' '.join(rng.choices(vocabulary, cum_weights=cum_weights, k=3)),
+                    ' '.join(rng.choices(vocabulary, cum_weights=cum_weights, k=40)),
+                    rng.choice(CITIES),
+                    'available',
+                    pk,
+                )
+
+        started = time.perf_counter()
+        db.executemany('INSERT INTO items_item VALUES (?, ?, ?, ?, ?, ?)', rows())
+        db.execute(
+            f'INSERT INTO {search.FTS_TABLE} (rowid, title, description, location) '
+            'SELECT id, title, description, location FROM items_item'
+        )
+        db.commit()
+        self.stdout.write(f'\n{size:,} items (loaded and indexed in {time.perf_counter() - started:.1f}s)')
+
+        for query in QUERIES:
+            like = f'%{query}%'
+            scan = self.time_it(repeat, db, (
+                "SELECT id FROM items_item WHERE status = 'available' AND "
+                "(title LIKE ? OR description LIKE ? OR location LIKE ?) "
+                "ORDER BY created_at DESC LIMIT 12"
+            ), (like, like, like))
+            match = search.build_match_query(query)
+            fts = self.time_it(repeat, db, (
+                f"SELECT items_item.id FROM items_item, {search.FTS_TABLE} "
+                f"WHERE {search.FTS_TABLE}.rowid = items_item.id AND {search.FTS_TABLE} MATCH ? "
+                "AND status = 'available' "
+                f"ORDER BY bm25({search.FTS_TABLE}, 10.0, 1.0, 2.0), created_at DESC LIMIT 12"
+            ), (match,))
+            hits = db.execute(
+                f'SELECT count(*) FROM {search.FTS_TABLE} WHERE {search.FTS_TABLE} MATCH ?', (match,)
+            ).fetchone()[0]
+            self.stdout.write(
+                f'  {query!r:22} {hits:>8,} hits   icontains {scan * 1000:9.1f} ms   fts5 {fts * 1000:9.1f} ms'
+            )
+        db.close()
+
+    def time_it(self, repeat, db, sql, params):
+        best = float('inf')
+        for _ in range(repeat):
+            started = time.perf_counter()
+            db.execute(sql, params).fetchall()
+            best = min(best, time.perf_counter() - started)
+        return best
@@ -0,0 +1,66 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from PIL import Image
+
+from items import thumbnails
+from items.models import ItemImage
+
+
+class Command(BaseCommand):
+    help = 'Render thumbnails and WebP/AVIF variants for existing item images in parallel.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Re-render images that already have derivatives.')
+        parser.add_argument('--workers', type=int, default=None)
+        parser.add_argument('--batch-size', type=int, default=200)
+
+    def handle(self, *args, **options):
+        images = ItemImage.objects.order_by('pk')
+        if not options['all']:
+            images = images.filter(derivatives={})
+        jobs = list(images.values_list('pk', 'image'))
+        if not jobs:
+            self.stdout.write('No images to process.')
+            return
+
+        render = partial(render_one, str(settings.MEDIA_ROOT), thumbnails.enabled_formats())
+        done = missing = failed = 0
+        pending = []
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            for pk, derivatives, error in pool.map(render, jobs, chunksize=8):
+                if error:
+                    failed += 1
+                    self.stderr.write(f'ItemImage {pk}: {error}, skipped')
+                    continue
+                if derivatives is None:
+                    missing += 1
+                    continue
+                pending.append(ItemImage(pk=pk, derivatives=derivatives))
+                if len(pending) >= options['batch_size']:
+                    done += self.save(pending)
+        done += self.save(pending)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Processed {done} images in {elapsed:.1f}s ({missing} originals missing, {failed} failed).'
+        ))
+
+    def save(self, pending):
+        ItemImage.objects.bulk_update(pending, ['derivatives'])
+        count = len(pending)
+        pending.clear()
+        return count
+
+
+def render_one(media_root, formats, job):
+    pk, name = job
+    # A corrupt original must not abort the whole pool.map
+    try:
+        return pk, thumbnails.render_derivatives(media_root, name, formats), None
+    except (OSError, Image.UnidentifiedImageError) as exc:
+        return pk, None, f'{type(exc).__name__}: {exc}'
@@ -0,0 +1,182 @@
+import csv
+import json
+import time
+from itertools import islice
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils.text import slugify
+
+from core import stats
+from core.excerpts import make_excerpt
+from core.slugs import allocate_slugs
+from items import search
+from items.models import Category, Item
+
+TRUE_VALUES = {'1', 'true', 'yes', 'y', 'free', 'on'}
+
+
+class InvalidRow:
+    """A line of the input that could not be read as a row."""
+
+    def __init__(self, problem):
+        self.problem = problem
+
+
+class Command(BaseCommand):
+    help = (
+        'Bulk import items from a CSV or JSONL file. Columns: title, description, '
+        'category (slug or name), owner (username), location, condition, status, is_free. '
+        'Progress is checkpointed after every chunk, so re-running the same command '
+        'resumes where a failed run stopped.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='Defaults to the file extension.')
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--owner', help='Username used for rows without an owner column.')
+        parser.add_argument('--create-categories', action='store_true', help='Create unknown categories instead of skipping the row.')
+        parser.add_argument('--checkpoint', help='Checkpoint file (default: <path>.checkpoint).')
+        parser.add_argument('--restart', action='store_true', help='Ignore an existing checkpoint.')
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.exists():
+            raise CommandError(f'{path} does not exist')
+        fmt = options['format'] or ('jsonl' if path.suffix in ('.jsonl', '.ndjson') else 'csv')
+        checkpoint = Path(options['checkpoint'] or f'{path}.checkpoint')
+
+        done = 0
+        if checkpoint.exists() and not options['restart']:
+            done = json.loads(checkpoint.read_text())['rows']
+            self.stdout.write(f'Resuming after row {done} (from {checkpoint})')
+
+        self.categories = {}
+        for category in Category.objects.all():
+            self.categories[category.slug] = category.pk
+            self.categories[category.name.lower()] = category.pk
+        self.owners = {}
+        self.places = {}
+        self.default_owner = options['owner']
+        self.create_categories = options['create_categories']
+
+        rows = islice(self.read(path, fmt), done, None)
+        imported = skipped = 0
+        started = time.perf_counter()
+        while True:
+            chunk = list(islice(rows, options['chunk_size']))
+            if not chunk:
+                break
+            items, rejected = self.build(chunk, done)
+            with transaction.atomic():
+                Item.objects.bulk_create(items)
+                search.index_items(items)
+            done += len(chunk)
+            imported += len(items)
+            skipped += rejected
+            checkpoint.write_text(json.dumps({'rows': done}))
+            rate = imported / (time.perf_counter() - started)
+            self.stdout.write(f'{done} rows read, {imported} imported, {skipped} skipped ({rate:,.0f} rows/s)')
+
+        checkpoint.unlink(missing_ok=True)
+        # bulk_create sends no signals
+        stats.refresh('available_items')
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {imported} items in {elapsed:.1f}s ({imported / max(elapsed, 1e-9):,.0f} rows/s), skipped {skipped}.'
+        ))
+
+    def read(self, path, fmt):
+        with open(path, newline='', encoding='utf-8') as fh:
+            if fmt == 'csv':
+                yield from csv.DictReader(fh)
+            else:
+                for line in fh:
+                    if line.strip():
+                        yield self.parse_line(line)
+
+    def parse_line(self, line):
+        # A bad line becomes a row that build() reports and skips, so it
+        # still counts towards the checkpoint and re-running the command
+        # (which resumes from the checkpoint unless --restart) moves past it
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as exc:
+            return InvalidRow(f'invalid JSON ({exc.msg})')
+        if not isinstance(row, dict):
+            return InvalidRow(f'expected a JSON object, got {type(row).__name__}')
+        # Numbers and booleans are read like their CSV spelling
+        return {key: value if value is None or isinstance(value, str) else str(value)
+                for key, value in row.items()}
+
+    def resolve_owners(self, chunk):
+        wanted = {(row.get('owner') or self.default_owner) for row in chunk if not isinstance(row, InvalidRow)}
+        wanted -= set(self.owners) | {None, ''}
+        if wanted:
+            self.owners.update(User.objects.filter(username__in=wanted).values_list('username', 'pk'))
+
+    def resolve_category(self, value):
+        value = (value or '').strip()
+        if not value:
+            return None
+        pk = self.categories.get(value) or self.categories.get(value.lower())
+        if pk is None and self.create_categories:
+            category, _ = Category.objects.get_or_create(name=value)
+            pk = self.categories[category.slug] = self.categories[value.lower()] = category.pk
+        return pk
+
+    def build(self, chunk, offset):
+        self.resolve_owners(chunk)
+        conditions = dict(Item.CONDITION_CHOICES)
+        statuses = dict(Item.STATUS_CHOICES)
+        items, rejected = [], 0
+        for number, row in enumerate(chunk, start=offset + 1):
+            if isinstance(row, InvalidRow):
+                self.stderr.write(f'Row {number}: {row.problem}, skipped')
+                rejected += 1
+                continue
+            title = (row.get('title') or '').strip()
+            owner_id = self.owners.get(row.get('owner') or self.default_owner)
+            category_id = self.resolve_category(row.get('category'))
+            problem = None
+            if not title:
+                problem = 'missing title'
+            elif owner_id is None:
+                problem = f"unknown owner {row.get('owner') or self.default_owner!r}"
+            elif row.get('category') and category_id is None:
+                problem = f"unknown category {row.get('category')!r}"
+            if problem:
+                self.stderr.write(f'Row {number}: {problem}, skipped')
+                rejected += 1
+                continue
+
+            condition = (row.get('condition') or Item.CONDITION_USED).lower()
+            status = (row.get('status') or Item.STATUS_AVAILABLE).lower()
+            is_free = row.get('is_free')
+            items.append(Item(
+                title=title[:200],
+                description=row.get('description') or '',
+                excerpt=make_excerpt(row.get('description')),
+                owner_id=owner_id,
+                category_id=category_id,
+                location=(row.get('location') or '')[:150],
+                condition=condition if condition in conditions else Item.CONDITION_USED,
+                status=status if status in statuses else Item.STATUS_AVAILABLE,
+                is_free=True if is_free in (None, '') else str(is_free).strip().lower() in TRUE_VALUES,
+            ))
+
+        # bulk_create skips save(), so excerpts are set above and geocoding happens here;
+        # imports repeat the same few locations
+        for item in items:
+            if item.location not in self.places:
+                probe = Item(location=item.location)
+                probe.geocode()
+                self.places[item.location] = (probe.latitude, probe.longitude, probe.grid_cell)
+            item.latitude, item.longitude, item.grid_cell = self.places[item.location]
+
+        for item, slug in zip(items, allocate_slugs(Item, [slugify(item.title)[:200] for item in items])):
+            item.slug = slug
+        return items, rejected
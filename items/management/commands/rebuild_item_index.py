@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from items import search
+from items.models import Item
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index for items from scratch.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        if not search.is_enabled():
+            self.stdout.write(self.style.WARNING('Full-text index is only available on SQLite; nothing to do.'))
+            return
+        total = search.rebuild_index(Item.objects.all(), chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'Indexed {total} items.'))
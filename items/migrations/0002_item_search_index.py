@@ -0,0 +1,34 @@
+from django.db import migrations
+
+from items import search
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    search.create_index(schema_editor)
+    Item = apps.get_model('items', 'Item')
+    rows = list(Item.objects.values_list('pk', 'title', 'description', 'location'))
+    if rows:
+        with schema_editor.connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {search.FTS_TABLE} (rowid, title, description, location) VALUES (%s, %s, %s, %s)",
+                rows,
+            )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    search.drop_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('items', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_primary_image(apps, schema_editor):
+    Item = apps.get_model('items', 'Item')
+    ItemImage = apps.get_model('items', 'ItemImage')
+    primary = {}
+    for image_id, item_id in ItemImage.objects.order_by('item_id', '-is_primary', '-uploaded_at').values_list('pk', 'item_id'):
+        primary.setdefault(item_id, image_id)
+    for item_id, image_id in primary.items():
+        Item.objects.filter(pk=item_id).update(primary_image_id=image_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('items', '0002_item_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='item',
+            name='primary_image',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='items.itemimage'),
+        ),
+        migrations.RunPython(backfill_primary_image, migrations.RunPython.noop),
+    ]
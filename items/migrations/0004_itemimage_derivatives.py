@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('items', '0003_item_primary_image'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='itemimage',
+            name='derivatives',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
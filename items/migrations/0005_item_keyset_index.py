@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('items', '0004_itemimage_derivatives'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='items_item_status_89b8f1_idx'),
+        ),
+    ]
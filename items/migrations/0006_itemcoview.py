@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('items', '0005_item_keyset_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemCoView',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.PositiveIntegerField(default=0)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='co_views', to='items.item')),
+                ('neighbor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='co_viewed_with', to='items.item')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['item', '-score'], name='items_itemc_item_id_0282ee_idx')],
+                'unique_together': {('item', 'neighbor')},
+            },
+        ),
+    ]
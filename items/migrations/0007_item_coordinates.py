@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:28
+
+from django.db import migrations, models
+
+from core import geo
+
+
+def geocode_items(apps, schema_editor):
+    Item = apps.get_model('items', 'Item')
+    for location in Item.objects.exclude(location='').values_list('location', flat=True).distinct():
+        point = geo.geocode(location)
+        if point:
+            latitude, longitude = round(point[0], 6), round(point[1], 6)
+            Item.objects.filter(location=location).update(
+                latitude=latitude, longitude=longitude, grid_cell=geo.grid_cell(latitude, longitude),
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('items', '0006_itemcoview'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='item',
+            name='grid_cell',
+            field=models.IntegerField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='item',
+            name='latitude',
+            field=models.DecimalField(blank=True, decimal_places=6, editable=False, max_digits=9, null=True),
+        ),
+        migrations.AddField(
+            model_name='item',
+            name='longitude',
+            field=models.DecimalField(blank=True, decimal_places=6, editable=False, max_digits=9, null=True),
+        ),
+        migrations.RunPython(geocode_items, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:02
+
+from django.db import migrations, models
+
+from core.excerpts import make_excerpt
+
+
+def fill_excerpts(apps, schema_editor):
+    Item = apps.get_model('items', 'Item')
+    rows = list(Item.objects.only('pk', 'description'))
+    for row in rows:
+        row.excerpt = make_excerpt(row.description)
+    Item.objects.bulk_update(rows, ['excerpt'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('items', '0007_item_coordinates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='item',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, max_length=300),
+        ),
+        migrations.RunPython(fill_excerpts, migrations.RunPython.noop),
+    ]
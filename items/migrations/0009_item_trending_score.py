@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+from core.trending import seed
+
+
+def seed_trending(apps, schema_editor):
+    Item = apps.get_model('items', 'Item')
+    rows = list(Item.objects.filter(views__gt=0).only('pk', 'views', 'created_at'))
+    for row in rows:
+        row.trending_score = seed(row.views, row.created_at)
+    Item.objects.bulk_update(rows, ['trending_score'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('items', '0008_item_excerpt'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='item',
+            name='trending_score',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['status', '-trending_score'], name='items_item_status_26faea_idx'),
+        ),
+        migrations.RunPython(seed_trending, migrations.RunPython.noop),
+    ]
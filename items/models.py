@@ -1,7 +1,15 @@
+from django.core.files.storage import default_storage
 from django.db import models
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 from django.utils.text import slugify
 from django.conf import settings
 
+from core import geo
+from core.excerpts import make_excerpt
+from core.slugs import save_with_unique_slug
+from . import search
+
 
 class Category(models.Model):
 	name = models.CharField(max_length=100, unique=True)
@@ -42,6 +50,8 @@ class Item(models.Model):
 	title = models.CharField(max_length=200)
 	slug = models.SlugField(max_length=220, unique=True)
 	description = models.TextField(blank=True)
+	# First words of the description for cards, so listings can defer it
+	excerpt = models.CharField(max_length=300, blank=True, editable=False)
 	owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='items')
 	category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, related_name='items')
 	location = models.CharField(max_length=150, blank=True)
@@ -50,30 +60,61 @@ class Item(models.Model):
 	is_free = models.BooleanField(default=True)
 	views = models.PositiveIntegerField(default=0)
 	created_at = models.DateTimeField(auto_now_add=True)
+	# Time-decayed popularity, see core.trending
+	trending_score = models.FloatField(default=0, editable=False)
+	# Resolved from `location` by core.geo on save; grid_cell backs radius search
+	latitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True, editable=False)
+	longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True, editable=False)
+	grid_cell = models.IntegerField(null=True, blank=True, editable=False, db_index=True)
+	# Denormalized copy of images.first(), so listings can select_related it
+	primary_image = models.ForeignKey(
+		'ItemImage', on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name='+'
+	)
 
 	class Meta:
 		ordering = ['-created_at']
+		indexes = [
+			# Keyset pagination of available items, newest first
+			models.Index(fields=['status', '-created_at', '-id']),
+			models.Index(fields=['status', '-trending_score']),
+		]
 
 	def __str__(self):
 		return self.title
 
 	def save(self, *args, **kwargs):
+		update_fields = kwargs.get('update_fields')
+		if update_fields is None or 'location' in update_fields:
+			self.geocode()
+			if update_fields is not None:
+				update_fields = kwargs['update_fields'] = {*update_fields, 'latitude', 'longitude', 'grid_cell'}
+		if update_fields is None or 'description' in update_fields:
+			self.excerpt = make_excerpt(self.description)
+			if update_fields is not None:
+				kwargs['update_fields'] = {*update_fields, 'excerpt'}
 		if not self.slug:
-			base = slugify(self.title)[:200]
-			slug = base
-			counter = 1
-			while Item.objects.filter(slug=slug).exists():
-				slug = f"{base}-{counter}"
-				counter += 1
-			self.slug = slug
+			return save_with_unique_slug(self, slugify(self.title)[:200], super().save, *args, **kwargs)
 		super().save(*args, **kwargs)
 
+	def geocode(self):
+		"""Set latitude/longitude/grid_cell from the free-text location."""
+		point = geo.geocode(self.location)
+		self.latitude, self.longitude = (round(point[0], 6), round(point[1], 6)) if point else (None, None)
+		self.grid_cell = geo.grid_cell(self.latitude, self.longitude)
+
+	def refresh_primary_image(self):
+		"""Point primary_image at the image the gallery shows first."""
+		self.primary_image = self.images.first()
+		Item.objects.filter(pk=self.pk).update(primary_image=self.primary_image)
+
 
 class ItemImage(models.Model):
 	item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name='images')
 	image = models.ImageField(upload_to='items/%Y/%m/%d/')
 	is_primary = models.BooleanField(default=False)
 	uploaded_at = models.DateTimeField(auto_now_add=True)
+	# {format: {width: storage name}}, filled in by items.thumbnails
+	derivatives = models.JSONField(default=dict, blank=True, editable=False)
 
 	class Meta:
 		ordering = ['-is_primary', '-uploaded_at']
@@ -81,3 +122,66 @@ class ItemImage(models.Model):
 	def __str__(self):
 		return f"Image for {self.item.title}"
 
+	def _srcset(self, fmt):
+		variants = self.derivatives.get(fmt, {})
+		return ', '.join(
+			f"{default_storage.url(name)} {width}w"
+			for width, name in sorted(variants.items(), key=lambda pair: int(pair[0]))
+		)
+
+	@property
+	def srcset(self):
+		return self._srcset('jpeg')
+
+	@property
+	def webp_srcset(self):
+		return self._srcset('webp')
+
+	@property
+	def avif_srcset(self):
+		return self._srcset('avif')
+
+	@property
+	def thumbnail_url(self):
+		"""Smallest card-sized rendition, or the original until derivatives exist."""
+		variants = self.derivatives.get('jpeg')
+		if not variants:
+			return self.image.url
+		width = min(variants, key=int)
+		return default_storage.url(variants[width])
+
+
+class ItemCoView(models.Model):
+	"""How often ``neighbor`` was viewed in the same session as ``item``; see items.related."""
+	item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name='co_views')
+	neighbor = models.ForeignKey(Item, on_delete=models.CASCADE, related_name='co_viewed_with')
+	score = models.PositiveIntegerField(default=0)
+
+	class Meta:
+		unique_together = ('item', 'neighbor')
+		indexes = [
+			models.Index(fields=['item', '-score']),
+		]
+
+	def __str__(self):
+		return f"{self.item_id} -> {self.neighbor_id} ({self.score})"
+
+
+@receiver(post_save, sender=Item)
+def index_item_for_search(sender, instance, update_fields=None, **kwargs):
+	# View counter bumps don't touch the searchable text
+	if update_fields and not {'title', 'description', 'location'} & set(update_fields):
+		return
+	search.index_item(instance)
+
+
+@receiver(post_delete, sender=Item)
+def remove_item_from_search(sender, instance, **kwargs):
+	search.remove_item(instance.pk)
+
+
+@receiver(post_save, sender=ItemImage)
+@receiver(post_delete, sender=ItemImage)
+def sync_primary_image(sender, instance, **kwargs):
+	# The item may already be gone when its images are cascade-deleted
+	Item(pk=instance.item_id).refresh_primary_image()
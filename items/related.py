@@ -0,0 +1,85 @@
+# items/related.py
+# "Similar items" from co-views: two items are related when the same visitor
+# viewed both, one shortly after the other (the trail lives in a core.recent
+# cookie, so recording it never writes the session). Detail views only append
+# pair increments to a buffered counter (core.counters); each flush folds them
+# into ItemCoView, which keeps at most MAX_NEIGHBORS rows per item, so the
+# detail page needs a single indexed lookup on (item, -score).
+
+from collections import defaultdict
+
+from core import recent
+from core.counters import BufferedCounter
+from .models import Item, ItemCoView
+
+MAX_NEIGHBORS = 12
+
+# How many of the visitor's previous item views pair with the current one
+TRAIL_LENGTH = 5
+
+
+def _apply_co_views(pending):
+    pairs = {}
+    for key, amount in pending.items():
+        item_id, _, neighbor_id = key.partition(':')
+        if item_id.isdigit() and neighbor_id.isdigit():
+            pairs[int(item_id), int(neighbor_id)] = amount
+    if not pairs:
+        return
+
+    # Items deleted since the views were recorded are dropped
+    ids = {pk for pair in pairs for pk in pair}
+    alive = set(Item.objects.filter(pk__in=ids).values_list('pk', flat=True))
+    pairs = {pair: amount for pair, amount in pairs.items() if alive.issuperset(pair)}
+    touched = {item_id for item_id, _ in pairs}
+
+    existing = {
+        (row.item_id, row.neighbor_id): row
+        for row in ItemCoView.objects.filter(item_id__in=touched)
+    }
+    updated, created = [], []
+    for (item_id, neighbor_id), amount in pairs.items():
+        row = existing.get((item_id, neighbor_id))
+        if row:
+            row.score += amount
+            updated.append(row)
+        else:
+            row = ItemCoView(item_id=item_id, neighbor_id=neighbor_id, score=amount)
+            existing[item_id, neighbor_id] = row
+            created.append(row)
+    ItemCoView.objects.bulk_update(updated, ['score'], batch_size=500)
+    ItemCoView.objects.bulk_create(created, batch_size=500)
+
+    # Keep the table compact: only each item's strongest neighbours survive
+    by_item = defaultdict(list)
+    for row in existing.values():
+        by_item[row.item_id].append(row)
+    dropped = []
+    for rows in by_item.values():
+        rows.sort(key=lambda row: row.score, reverse=True)
+        dropped.extend(row.pk for row in rows[MAX_NEIGHBORS:] if row.pk)
+    for start in range(0, len(dropped), 500):
+        ItemCoView.objects.filter(pk__in=dropped[start:start + 500]).delete()
+
+
+co_views = BufferedCounter('coviews', _apply_co_views)
+
+
+def record_view(request, item):
+    """Pair ``item`` with the items this visitor viewed just before."""
+    trail = recent.get(request, 'items', size=TRAIL_LENGTH + 1)
+    keys = []
+    for other in trail:
+        if other != item.pk:
+            keys += [f'{item.pk}:{other}', f'{other}:{item.pk}']
+    if keys:
+        co_views.add_many(keys[:2 * TRAIL_LENGTH])
+    trail.add(item.pk)
+
+
+def related_items(item, limit=4):
+    return (
+        Item.objects.filter(co_viewed_with__item=item, status=Item.STATUS_AVAILABLE)
+        .select_related('category', 'primary_image')
+        .order_by('-co_viewed_with__score')[:limit]
+    )
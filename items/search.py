@@ -0,0 +1,128 @@
+# items/search.py
+# Full-text search for items, backed by an SQLite FTS5 table that mirrors
+# Item.title, Item.description and Item.location keyed by the item id.
+
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+FTS_TABLE = 'items_item_fts'
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def is_enabled():
+    return connection.vendor == 'sqlite'
+
+
+def create_index(schema_editor=None):
+    """Create the FTS5 table if it does not exist yet."""
+    cursor_source = schema_editor.connection if schema_editor else connection
+    with cursor_source.cursor() as cursor:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            "title, description, location, "
+            "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+        )
+
+
+def drop_index(schema_editor=None):
+    cursor_source = schema_editor.connection if schema_editor else connection
+    with cursor_source.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+def index_items(items):
+    """Insert or replace the index rows for the given items."""
+    if not is_enabled():
+        return
+    rows = [(item.pk, item.title, item.description, item.location) for item in items]
+    if not rows:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [(row[0],) for row in rows]
+        )
+        cursor.executemany(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, description, location) VALUES (%s, %s, %s, %s)",
+            rows,
+        )
+
+
+def index_item(item):
+    index_items([item])
+
+
+def remove_item(item_id):
+    if not is_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [item_id])
+
+
+def rebuild_index(queryset, chunk_size=2000):
+    """Drop and repopulate the whole index from ``queryset``. Returns the row count."""
+    if not is_enabled():
+        return 0
+    drop_index()
+    create_index()
+    total = 0
+    batch = []
+    rows = queryset.order_by().values_list('pk', 'title', 'description', 'location')
+    with connection.cursor() as cursor:
+        for row in rows.iterator(chunk_size=chunk_size):
+            batch.append(row)
+            if len(batch) >= chunk_size:
+                cursor.executemany(
+                    f"INSERT INTO {FTS_TABLE} (rowid, title, description, location) VALUES (%s, %s, %s, %s)",
+                    batch,
+                )
+                total += len(batch)
+                batch = []
+        if batch:
+            cursor.executemany(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, description, location) VALUES (%s, %s, %s, %s)",
+                batch,
+            )
+            total += len(batch)
+        cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+    return total
+
+
+def build_match_query(text):
+    """
+    Turn free text from the search box into a safe FTS5 expression.
+
+    Every word becomes a quoted prefix term, so user input can never produce
+    an FTS5 syntax error and "bik" still finds "bike".
+    """
+    tokens = TOKEN_RE.findall(text.lower())
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def search(queryset, text):
+    """
+    Restrict ``queryset`` to items matching ``text``, best matches first.
+
+    Falls back to the icontains scan on databases without FTS5.
+    """
+    if not is_enabled():
+        return queryset.filter(
+            Q(title__icontains=text) |
+            Q(description__icontains=text) |
+            Q(location__icontains=text)
+        )
+
+    match = build_match_query(text)
+    if not match:
+        return queryset.none()
+
+    # Join the FTS table directly so SQLite drives the query from the index.
+    # bm25() is lower-is-better; title hits weigh more than body or location.
+    return queryset.extra(
+        tables=[FTS_TABLE],
+        where=[f'{FTS_TABLE}.rowid = items_item.id', f'{FTS_TABLE} MATCH %s'],
+        params=[match],
+        select={'search_rank': f'bm25({FTS_TABLE}, 10.0, 1.0, 2.0)'},
+    ).order_by('search_rank', '-created_at')
@@ -0,0 +1,126 @@
+# items/thumbnails.py
+# Resized derivatives for ItemImage uploads: fixed-width JPEG thumbnails plus
+# WebP (and AVIF when Pillow supports it) variants, rendered in a background
+# process pool so uploads never wait on image encoding.
+#
+# Derivatives are written next to the originals under MEDIA_ROOT, e.g.
+#   items/2025/11/23/photo.png -> items/derivatives/2025/11/23/photo_400w.webp
+# and their names are recorded in ItemImage.derivatives.
+
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path, PurePosixPath
+
+from django.conf import settings
+from django.db import connection, transaction
+from PIL import Image, ImageOps, features
+
+logger = logging.getLogger(__name__)
+
+WIDTHS = (200, 400, 800)
+
+# format key -> (Pillow format, file extension, save options)
+FORMATS = {
+    'jpeg': ('JPEG', 'jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+    'webp': ('WEBP', 'webp', {'quality': 80, 'method': 4}),
+    'avif': ('AVIF', 'avif', {'quality': 60}),
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def enabled_formats():
+    formats = ['jpeg']
+    for key in ('webp', 'avif'):
+        try:
+            if features.check(key):
+                formats.append(key)
+        except ValueError:  # feature unknown to this Pillow version
+            pass
+    return formats
+
+
+def derivative_name(name, width, extension):
+    path = PurePosixPath(name)
+    parts = path.parent.parts
+    if parts and parts[0] == 'items':
+        parts = parts[1:]
+    return str(PurePosixPath('items', 'derivatives', *parts, f'{path.stem}_{width}w.{extension}'))
+
+
+def render_derivatives(media_root, name, formats):
+    """
+    Render every derivative of the original stored at ``name``.
+
+    Runs in a worker process, so it only touches Pillow and the filesystem.
+    Returns {format: {width: derivative name}}, or None if the original is missing.
+    An unreadable original raises OSError (PIL.UnidentifiedImageError for
+    files Pillow can't identify).
+    """
+    root = Path(media_root)
+    try:
+        with Image.open(root / name) as original:
+            original = ImageOps.exif_transpose(original)
+            result = {}
+            for width in WIDTHS:
+                # Never upscale; the smallest width is always produced
+                if width > original.width and width != WIDTHS[0]:
+                    break
+                resized = original.copy()
+                resized.thumbnail((width, width * 4), Image.LANCZOS)
+                for key in formats:
+                    pil_format, extension, options = FORMATS[key]
+                    image = resized
+                    if pil_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+                        image = image.convert('RGB')
+                    elif image.mode not in ('RGB', 'RGBA', 'L'):
+                        image = image.convert('RGBA')
+                    target = derivative_name(name, width, extension)
+                    output = root / target
+                    output.parent.mkdir(parents=True, exist_ok=True)
+                    image.save(output, pil_format, **options)
+                    result.setdefault(key, {})[str(width)] = target
+            return result
+    except FileNotFoundError:
+        return None
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=getattr(settings, 'THUMBNAIL_WORKERS', 2))
+        return _executor
+
+
+def _store(image_id, future):
+    from .models import ItemImage
+    try:
+        derivatives = future.result()
+        if derivatives is not None:
+            ItemImage.objects.filter(pk=image_id).update(derivatives=derivatives)
+    except Exception:
+        logger.exception('Rendering derivatives for ItemImage %s failed', image_id)
+    finally:
+        # Callbacks normally run on the pool's management thread, which must
+        # not leak its connection; never close one inside a transaction.
+        if not connection.in_atomic_block:
+            connection.close()
+
+
+def schedule(images):
+    """Queue derivative rendering for ``images`` once the current transaction commits."""
+    jobs = [(image.pk, image.image.name) for image in images if image.pk and image.image]
+    if not jobs:
+        return
+
+    def submit():
+        executor = get_executor()
+        formats = enabled_formats()
+        for image_id, name in jobs:
+            future = executor.submit(render_derivatives, settings.MEDIA_ROOT, name, formats)
+            future.add_done_callback(lambda done, image_id=image_id: _store(image_id, done))
+
+    transaction.on_commit(submit)
@@ -5,29 +5,53 @@ from django.contrib import messages
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.urls import reverse_lazy
-from django.db.models import Q
-from .models import Item, Category
+from core import geo, refdata
+from core.counters import record_view
+from core.pagination import CursorPaginationMixin
+from .models import Item
 from .forms import ItemForm, ItemImageFormSet
+from . import related, search, thumbnails
+from .facets import get_facets
 
-class ItemListView(ListView):
+class ItemListView(CursorPaginationMixin, ListView):
     model = Item
     template_name = 'items/item_list.html'
     context_object_name = 'items'
     paginate_by = 12
-
-    def get_queryset(self):
+    default_radius_km = 10
+
+    def get_origin(self):
+        """(latitude, longitude, radius_km) for ?near=<place or postal code>&radius=<km>, or None."""
+        if not hasattr(self, '_origin'):
+            self._origin = None
+            point = geo.geocode(self.request.GET.get('near', ''))
+            if point:
+                try:
+                    radius = float(self.request.GET.get('radius') or self.default_radius_km)
+                except ValueError:
+                    radius = self.default_radius_km
+                radius = min(max(radius, 1), geo.MAX_RADIUS_KM)
+                self._origin = (point[0], point[1], radius)
+        return self._origin
+
+    def get_search_queryset(self):
         # Filter for available items by default
-        queryset = Item.objects.filter(status=Item.STATUS_AVAILABLE).select_related('category', 'owner')
+        queryset = Item.objects.filter(status=Item.STATUS_AVAILABLE).select_related('category', 'owner', 'primary_image').defer('description')
         
-        # Search by keyword
+        # Search by keyword (ranked full-text match, best results first)
         search_query = self.request.GET.get('search', '')
         if search_query:
-            queryset = queryset.filter(
-                Q(title__icontains=search_query) |
-                Q(description__icontains=search_query) |
-                Q(location__icontains=search_query)
-            )
-        
+            queryset = search.search(queryset, search_query)
+
+        # Radius search around a place or postal code, nearest first
+        origin = self.get_origin()
+        if origin:
+            queryset = geo.within_radius(queryset, *origin)
+        return queryset
+
+    def get_queryset(self):
+        queryset = self.get_search_queryset()
+
         # Filter by category
         category_slug = self.request.GET.get('category')
         if category_slug:
@@ -50,16 +74,31 @@ class ItemListView(ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         # 1. Pass Categories for the dropdown
-        context['categories'] = Category.objects.all()
+        context['categories'] = refdata.item_categories.get()
         
         # 2. Pass Condition Choices for the dropdown (THIS WAS MISSING)
         context['condition_choices'] = Item.CONDITION_CHOICES
+
+        # 3. Facet counts for the dropdowns, from one grouped query over the search results
+        context['facets'] = get_facets(
+            self.get_search_queryset(),
+            context['categories'],
+            search=self.request.GET.get('search', ''),
+            category=self.request.GET.get('category', ''),
+            condition=self.request.GET.get('condition', ''),
+            item_type=self.request.GET.get('type', ''),
+            near=self.get_origin(),
+        )
         
-        # 3. Preserve the user's search inputs so they don't disappear after clicking search
+        # 4. Preserve the user's search inputs so they don't disappear after clicking search
         context['search_query'] = self.request.GET.get('search', '')
         context['selected_category'] = self.request.GET.get('category', '')
         context['selected_condition'] = self.request.GET.get('condition', '')
         context['selected_type'] = self.request.GET.get('type', '')
+        context['near_query'] = self.request.GET.get('near', '')
+        context['selected_radius'] = self.get_origin()[2] if self.get_origin() else self.default_radius_km
+        context['radius_choices'] = [5, 10, 25, 50, 100]
+        context['near_not_found'] = bool(context['near_query']) and not self.get_origin()
         
         return context
 
@@ -70,12 +109,18 @@ class ItemDetailView(DetailView):
     
     def get_object(self):
         obj = super().get_object()
-        # Increment view count
+        # Increment view count (buffered, written in batches)
         if self.request.user != obj.owner:
+            record_view(obj)
             obj.views += 1
-            obj.save(update_fields=['views'])
+            related.record_view(self.request, obj)
         return obj
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['related_items'] = related.related_items(self.object)
+        return context
+
 class ItemCreateView(LoginRequiredMixin, CreateView):
     model = Item
     form_class = ItemForm
@@ -97,7 +142,7 @@ class ItemCreateView(LoginRequiredMixin, CreateView):
             form.instance.owner = self.request.user
             self.object = form.save()
             image_formset.instance = self.object
-            image_formset.save()
+            thumbnails.schedule(image_formset.save())
             messages.success(self.request, 'Item listed successfully!')
             return redirect('items:item_detail', slug=self.object.slug)
         
@@ -125,7 +170,7 @@ class ItemUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
         
         if image_formset.is_valid():
             self.object = form.save()
-            image_formset.save()
+            thumbnails.schedule(image_formset.save())
             messages.success(self.request, 'Item updated successfully!')
             return redirect('items:item_detail', slug=self.object.slug)
         
@@ -141,5 +186,5 @@ class ItemDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
 
 @login_required
 def my_items(request):
-    items = Item.objects.filter(owner=request.user)
+    items = Item.objects.filter(owner=request.user).select_related('category', 'primary_image')
     return render(request, 'items/my_items.html', {'items': items})
\ No newline at end of file
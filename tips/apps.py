@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class TipsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tips'
+
+    def ready(self):
+        # Connects the signals that keep similar tips current
+        from . import similarity  # noqa: F401
@@ -0,0 +1,144 @@
+# tips/favorites.py
+# Favorite counts and the "most saved" leaderboard.
+#
+# RecyclingTip.favorite_count mirrors the number of FavoriteTip rows of each
+# tip. toggle_favorite adjusts it with a conditional UPDATE in the same
+# transaction as the row it adds or removes; FavoriteTip rows removed any
+# other way (a user deleting their account, the admin) leave it high until
+# `manage.py reconcile_favorite_counts` repairs it. The same UPDATE moves the
+# tip's trending score (core.trending).
+#
+# Each user's favorite tip ids are cached as a sorted array of 8-byte ints
+# (a few bytes per favorite), so list pages can mark saved tips without a
+# query; toggle_favorite drops the entry.
+#
+# The leaderboard ranks tips within each category by that counter in one
+# windowed query and is cached for LEADERBOARD_TTL seconds: counts move with
+# every save, and a ranking a few minutes old is fine. The trending list
+# (core.trending) is cached the same way, for TRENDING_TTL seconds.
+
+from array import array
+from bisect import bisect_left
+
+from django.core.cache import cache
+from django.db.models import Count, F, OuterRef, Subquery, Window
+from django.db.models.functions import Coalesce, RowNumber
+
+from core import refdata, trending
+from .models import FavoriteTip, RecyclingTip
+
+LEADERBOARD_TTL = 300
+LEADERBOARD_SIZE = 5
+
+TRENDING_TTL = 60
+TRENDING_SIZE = 5
+
+# Favorites removed without toggle_favorite (e.g. by the admin) show up after this
+FAVORITE_IDS_TTL = 60 * 60 * 24
+
+
+def add(tip):
+    RecyclingTip.objects.filter(pk=tip.pk).update(
+        favorite_count=F('favorite_count') + 1, trending_score=trending.added(trending.FAVORITE_WEIGHT),
+    )
+
+
+def remove(tip, favorited_at):
+    # Never below zero, even if the counter had drifted low. The trending
+    # score gives back what the favorite added when it was made.
+    RecyclingTip.objects.filter(pk=tip.pk, favorite_count__gt=0).update(
+        favorite_count=F('favorite_count') - 1,
+        trending_score=trending.removed(trending.FAVORITE_WEIGHT, favorited_at),
+    )
+
+
+class TipIdSet:
+    """Membership tests on a sorted array of tip ids."""
+
+    def __init__(self, ids):
+        self.ids = ids
+
+    def __contains__(self, pk):
+        index = bisect_left(self.ids, pk)
+        return index < len(self.ids) and self.ids[index] == pk
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def __len__(self):
+        return len(self.ids)
+
+
+def _favorite_ids_key(user):
+    return f'tips:favorite_ids:{user.pk}'
+
+
+def favorite_ids(user):
+    """The ids of the tips ``user`` saved, as a TipIdSet."""
+    key = _favorite_ids_key(user)
+    data = cache.get(key)
+    ids = array('q')
+    if data is None:
+        ids.extend(sorted(FavoriteTip.objects.filter(user=user).values_list('tip_id', flat=True).order_by()))
+        cache.set(key, ids.tobytes(), FAVORITE_IDS_TTL)
+    else:
+        ids.frombytes(data)
+    return TipIdSet(ids)
+
+
+def forget_favorite_ids(user):
+    cache.delete(_favorite_ids_key(user))
+
+
+def _most_saved(size):
+    ranked = (
+        RecyclingTip.objects.filter(favorite_count__gt=0)
+        .annotate(rank=Window(
+            RowNumber(), partition_by=[F('category')], order_by=[F('favorite_count').desc(), F('pk').desc()],
+        ))
+        .filter(rank__lte=size)
+        .select_related('category', 'author')
+        .order_by('rank')
+    )
+    by_category = {}
+    for tip in ranked:
+        by_category.setdefault(tip.category_id, []).append(tip)
+    # Categories in name order, uncategorised tips last
+    boards = [(category, by_category[category.pk]) for category in refdata.tip_categories.get()
+              if category.pk in by_category]
+    if None in by_category:
+        boards.append((None, by_category[None]))
+    return boards
+
+
+def most_saved(size=LEADERBOARD_SIZE):
+    """[(category or None, [tips])]: each category's ``size`` most saved tips."""
+    return cache.get_or_set(f'tips:most_saved:{size}', lambda: _most_saved(size), LEADERBOARD_TTL)
+
+
+def _trending(size):
+    return list(RecyclingTip.objects.filter(trending_score__gt=0).defer('content').order_by('-trending_score')[:size])
+
+
+def trending_tips(size=TRENDING_SIZE):
+    """The ``size`` tips with the highest trending score."""
+    return cache.get_or_set(f'tips:trending:{size}', lambda: _trending(size), TRENDING_TTL)
+
+
+def reconcile(chunk_size=500):
+    """Recount favorite_count for tips whose counter drifted; returns how many were fixed."""
+    drifted = list(
+        RecyclingTip.objects.annotate(actual=Count('favorited_by'))
+        .exclude(favorite_count=F('actual'))
+        .values_list('pk', flat=True)
+    )
+    # Recounted inside the UPDATE, so favorites toggled meanwhile aren't lost
+    counts = (
+        FavoriteTip.objects.filter(tip=OuterRef('pk')).order_by()
+        .values('tip').annotate(total=Count('pk')).values('total')
+    )
+    for start in range(0, len(drifted), chunk_size):
+        RecyclingTip.objects.filter(pk__in=drifted[start:start + chunk_size]).update(
+            favorite_count=Coalesce(Subquery(counts), 0)
+        )
+    return len(drifted)
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from tips import similarity
+
+
+class Command(BaseCommand):
+    help = 'Recompute the similar-tips table from the text of every tip.'
+
+    def handle(self, *args, **options):
+        total = similarity.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Stored {total} similar-tip pairs.'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from tips import favorites
+
+
+class Command(BaseCommand):
+    help = 'Recount RecyclingTip.favorite_count for tips whose counter no longer matches their favorites.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        fixed = favorites.reconcile(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'Repaired the favorite count of {fixed} tips.'))
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tips', '0002_alter_recyclingtip_category'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='recyclingtip',
+            index=models.Index(fields=['-created_at', '-id'], name='tips_recycl_created_8a52c5_idx'),
+        ),
+    ]
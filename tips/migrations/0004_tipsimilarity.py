@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from tips.similarity import Corpus
+
+
+def compute_similarities(apps, schema_editor):
+    RecyclingTip = apps.get_model('tips', 'RecyclingTip')
+    TipSimilarity = apps.get_model('tips', 'TipSimilarity')
+    corpus = Corpus(RecyclingTip.objects.values_list('pk', 'title', 'content').iterator())
+    TipSimilarity.objects.bulk_create(
+        [
+            TipSimilarity(tip_id=pk, neighbor_id=other, score=score)
+            for pk in corpus.terms
+            for other, score in corpus.neighbors(pk)
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tips', '0003_recyclingtip_keyset_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TipSimilarity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('neighbor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_to', to='tips.recyclingtip')),
+                ('tip', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similarities', to='tips.recyclingtip')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['tip', '-score'], name='tips_tipsim_tip_id_486f56_idx')],
+                'unique_together': {('tip', 'neighbor')},
+            },
+        ),
+        migrations.RunPython(compute_similarities, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:59
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_favorites(apps, schema_editor):
+    RecyclingTip = apps.get_model('tips', 'RecyclingTip')
+    FavoriteTip = apps.get_model('tips', 'FavoriteTip')
+    counts = (
+        FavoriteTip.objects.filter(tip=OuterRef('pk')).order_by()
+        .values('tip').annotate(total=Count('pk')).values('total')
+    )
+    RecyclingTip.objects.update(favorite_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tips', '0004_tipsimilarity'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recyclingtip',
+            name='favorite_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='recyclingtip',
+            index=models.Index(fields=['category', '-favorite_count'], name='tips_recycl_categor_24ad6f_idx'),
+        ),
+        migrations.RunPython(count_favorites, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:02
+
+from django.db import migrations, models
+
+from core.excerpts import make_excerpt
+
+
+def fill_excerpts(apps, schema_editor):
+    RecyclingTip = apps.get_model('tips', 'RecyclingTip')
+    rows = list(RecyclingTip.objects.only('pk', 'content'))
+    for row in rows:
+        row.excerpt = make_excerpt(row.content)
+    RecyclingTip.objects.bulk_update(rows, ['excerpt'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tips', '0005_recyclingtip_favorite_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recyclingtip',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, max_length=300),
+        ),
+        migrations.RunPython(fill_excerpts, migrations.RunPython.noop),
+    ]
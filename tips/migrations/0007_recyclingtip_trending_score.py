@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:04
+
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Q
+
+from core.trending import seed
+
+
+def seed_trending(apps, schema_editor):
+    RecyclingTip = apps.get_model('tips', 'RecyclingTip')
+    FavoriteTip = apps.get_model('tips', 'FavoriteTip')
+    favorited_at = defaultdict(list)
+    for tip_id, created_at in FavoriteTip.objects.values_list('tip_id', 'created_at').iterator():
+        favorited_at[tip_id].append(created_at)
+    rows = list(
+        RecyclingTip.objects.filter(Q(views__gt=0) | Q(pk__in=FavoriteTip.objects.values('tip')))
+        .only('pk', 'views', 'created_at')
+    )
+    for row in rows:
+        row.trending_score = seed(row.views, row.created_at, favorited_at[row.pk])
+    RecyclingTip.objects.bulk_update(rows, ['trending_score'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tips', '0006_recyclingtip_excerpt'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recyclingtip',
+            name='trending_score',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='recyclingtip',
+            index=models.Index(fields=['-trending_score'], name='tips_recycl_trendin_116a56_idx'),
+        ),
+        migrations.RunPython(seed_trending, migrations.RunPython.noop),
+    ]
@@ -5,6 +5,9 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.utils.text import slugify
+from core.counters import record_view
+from core.excerpts import make_excerpt
+from core.slugs import save_with_unique_slug
 
 class TipCategory(models.Model):
     name = models.CharField(max_length=100, unique=True)
@@ -29,6 +32,8 @@ class RecyclingTip(models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(max_length=200, unique=True, blank=True)
     content = models.TextField()
+    # First words of the content for cards, so listings can defer it
+    excerpt = models.CharField(max_length=300, blank=True, editable=False)
     category = models.ForeignKey(TipCategory, on_delete=models.SET_NULL, related_name='tips', null=True, blank=True)
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='tips')
     image = models.ImageField(upload_to='tips/%Y/%m/%d/', blank=True, null=True)
@@ -36,31 +41,38 @@ class RecyclingTip(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     views = models.PositiveIntegerField(default=0)
+    # How many users saved the tip; kept by toggle_favorite, see tips.favorites
+    favorite_count = models.PositiveIntegerField(default=0, editable=False)
+    # Time-decayed popularity, see core.trending
+    trending_score = models.FloatField(default=0, editable=False)
 
     class Meta:
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['-created_at']),
             models.Index(fields=['category']),
+            models.Index(fields=['-created_at', '-id']),
+            models.Index(fields=['category', '-favorite_count']),
+            models.Index(fields=['-trending_score']),
         ]
 
     def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'content' in update_fields:
+            self.excerpt = make_excerpt(self.content)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'excerpt'}
         if not self.slug:
-            base_slug = slugify(self.title)
-            slug = base_slug
-            counter = 1
-            while RecyclingTip.objects.filter(slug=slug).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-            self.slug = slug
+            return save_with_unique_slug(self, slugify(self.title), super().save, *args, **kwargs)
         super().save(*args, **kwargs)
 
     def __str__(self):
         return self.title
 
     def increment_views(self):
+        # Buffered: the stored counter catches up on the next flush
+        record_view(self)
         self.views += 1
-        self.save(update_fields=['views'])
 
 class FavoriteTip(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='favorite_tips')
@@ -72,4 +84,19 @@ class FavoriteTip(models.Model):
         ordering = ['-created_at']
 
     def __str__(self):
-        return f"{self.user.username} - {self.tip.title}"
\ No newline at end of file
+        return f"{self.user.username} - {self.tip.title}"
+
+class TipSimilarity(models.Model):
+    """How alike ``neighbor``'s text is to ``tip``'s (cosine of TF-IDF vectors); see tips.similarity."""
+    tip = models.ForeignKey(RecyclingTip, on_delete=models.CASCADE, related_name='similarities')
+    neighbor = models.ForeignKey(RecyclingTip, on_delete=models.CASCADE, related_name='similar_to')
+    score = models.FloatField()
+
+    class Meta:
+        unique_together = ('tip', 'neighbor')
+        indexes = [
+            models.Index(fields=['tip', '-score']),
+        ]
+
+    def __str__(self):
+        return f"{self.tip_id} -> {self.neighbor_id} ({self.score:.3f})"
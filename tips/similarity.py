@@ -0,0 +1,224 @@
+# tips/similarity.py
+# "Similar tips" from the tips' own text.
+#
+# Each tip is a TF-IDF vector over the words of its title (counted twice:
+# titles are short and on topic) and content. A tip uses a few dozen words
+# out of a vocabulary of thousands, so vectors are sparse dicts and an
+# inverted index finds the tips that share a word with it; only those can
+# have a non-zero cosine. TipSimilarity keeps each tip's MAX_NEIGHBORS best
+# matches, so the detail page needs one indexed lookup on (tip, -score).
+#
+# Saving a tip recomputes its own neighbours and offers it to the lists of
+# the MAX_OFFERS tips it most resembles (and rescores it on the lists that
+# already had it). Other tips' weights drift a little as the vocabulary
+# grows; `manage.py rebuild_tip_similarity` recomputes every list.
+
+import heapq
+import math
+import re
+import uuid
+from collections import Counter, defaultdict
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.html import strip_tags
+
+from .models import RecyclingTip, TipSimilarity
+
+MAX_NEIGHBORS = 8
+
+# How many of its closest tips a saved tip is offered to as a neighbour
+MAX_OFFERS = 50
+
+# Candidates come from the tips sharing one of a tip's most heavily weighted
+# words (more are used while too few are found); all words count towards the
+# score. This keeps common words from making every pair a candidate.
+CANDIDATE_TERMS = 10
+
+VERSION_KEY = 'tips:similarity:version'
+
+WORD_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+STOP_WORDS = frozenset('''
+    a about after all also an and any are as at be because been but by can could did do does
+    for from get had has have how if in into is it its it's just like make may more most much
+    must no not of on once one only or other our out over should so some such than that the
+    their them then there these they this those through to too up use used using very was way
+    we were what when where which while who will with would you your
+'''.split())
+
+_corpus = None
+_corpus_version = None
+
+
+def words(text):
+    return [word for word in WORD_RE.findall(strip_tags(text or '').lower())
+            if len(word) > 1 and word not in STOP_WORDS]
+
+
+def term_counts(title, content):
+    return Counter(words(title) * 2 + words(content))
+
+
+class Corpus:
+    """Term counts of every tip, with an inverted index from term to tips."""
+
+    def __init__(self, docs=()):
+        # docs: (pk, title, content) tuples
+        self.terms = {}
+        self.postings = defaultdict(set)
+        self._vectors = {}
+        for pk, title, content in docs:
+            self.add(pk, title, content)
+
+    def __len__(self):
+        return len(self.terms)
+
+    def add(self, pk, title, content):
+        self.remove(pk)
+        self.terms[pk] = term_counts(title, content)
+        for term in self.terms[pk]:
+            self.postings[term].add(pk)
+
+    def remove(self, pk):
+        for term in self.terms.pop(pk, ()):
+            self.postings[term].discard(pk)
+            if not self.postings[term]:
+                del self.postings[term]
+        # Other tips keep the weights they were given; one edit barely moves
+        # the document frequencies, and rebuild() starts from a fresh corpus
+        self._vectors.pop(pk, None)
+
+    def vector(self, pk):
+        """Unit-length TF-IDF vector of a tip, as {term: weight}."""
+        if pk not in self._vectors:
+            total = len(self.terms) + 1
+            weights = {
+                term: (1 + math.log(count)) * (math.log(total / (1 + len(self.postings[term]))) + 1)
+                for term, count in self.terms[pk].items()
+            }
+            norm = math.sqrt(sum(weight * weight for weight in weights.values())) or 1.0
+            self._vectors[pk] = {term: weight / norm for term, weight in weights.items()}
+        return self._vectors[pk]
+
+    def scores(self, pk):
+        """{other pk: cosine similarity} for the candidate tips of ``pk``."""
+        vector = self.vector(pk)
+        candidates = set()
+        for rank, term in enumerate(sorted(vector, key=vector.get, reverse=True)):
+            # The tip itself is in every posting list, hence the ">"
+            if rank >= CANDIDATE_TERMS and len(candidates) > MAX_NEIGHBORS:
+                break
+            candidates |= self.postings[term]
+        candidates.discard(pk)
+        scores = {}
+        for other in candidates:
+            other_vector = self.vector(other)
+            small, large = sorted((vector, other_vector), key=len)
+            scores[other] = sum(weight * large.get(term, 0.0) for term, weight in small.items())
+        return scores
+
+    def neighbors(self, pk, k=MAX_NEIGHBORS):
+        """[(other pk, score)] of the ``k`` most similar tips, best first."""
+        return heapq.nlargest(k, self.scores(pk).items(), key=lambda pair: pair[1])
+
+
+def get_corpus():
+    """The process-wide corpus, reloaded if tips changed since it was built."""
+    global _corpus, _corpus_version
+    version = cache.get_or_set(VERSION_KEY, lambda: uuid.uuid4().hex, None)
+    if _corpus is None or version != _corpus_version:
+        _corpus = Corpus(RecyclingTip.objects.values_list('pk', 'title', 'content').iterator())
+        _corpus_version = version
+    return _corpus
+
+
+def _corpus_changed():
+    # This process's corpus already has the change; the others reload
+    global _corpus_version
+    _corpus_version = uuid.uuid4().hex
+    cache.set(VERSION_KEY, _corpus_version, None)
+
+
+def rebuild():
+    """Recompute every tip's neighbours from scratch; returns how many rows were stored."""
+    global _corpus
+    _corpus = Corpus(RecyclingTip.objects.values_list('pk', 'title', 'content').iterator())
+    rows = [
+        TipSimilarity(tip_id=pk, neighbor_id=other, score=score)
+        for pk in _corpus.terms
+        for other, score in _corpus.neighbors(pk)
+    ]
+    with transaction.atomic():
+        TipSimilarity.objects.all().delete()
+        TipSimilarity.objects.bulk_create(rows, batch_size=1000)
+    _corpus_changed()
+    return len(rows)
+
+
+def update_tip(tip):
+    """Recompute ``tip``'s neighbours and its place in other tips' lists."""
+    corpus = get_corpus()
+    corpus.add(tip.pk, tip.title, tip.content)
+    scores = corpus.scores(tip.pk)
+    closest = heapq.nlargest(MAX_OFFERS, scores.items(), key=lambda pair: pair[1])
+    best = closest[:MAX_NEIGHBORS]
+
+    with transaction.atomic():
+        TipSimilarity.objects.filter(tip=tip).delete()
+        TipSimilarity.objects.bulk_create(
+            [TipSimilarity(tip_id=tip.pk, neighbor_id=other, score=score) for other, score in best]
+        )
+
+        # Lists of the closest tips, and of tips that listed this one before the edit
+        offers = [other for other, _ in closest]
+        lists = defaultdict(dict)
+        affected = TipSimilarity.objects.filter(tip__in=offers) | TipSimilarity.objects.filter(neighbor=tip)
+        for other, neighbor, score in affected.values_list('tip', 'neighbor', 'score'):
+            lists[other][neighbor] = score
+        for other in offers:
+            lists.setdefault(other, {})
+
+        stale, created, dropped = [], [], []
+        for other, neighbors in lists.items():
+            score = scores.get(other, 0.0)
+            listed = tip.pk in neighbors
+            if listed:
+                stale.append(other)
+                del neighbors[tip.pk]
+            weakest = min(neighbors, key=neighbors.get, default=None)
+            if score > 0 and (len(neighbors) < MAX_NEIGHBORS or score > neighbors[weakest]):
+                created.append(TipSimilarity(tip_id=other, neighbor_id=tip.pk, score=score))
+                if len(neighbors) >= MAX_NEIGHBORS:
+                    dropped.append((other, weakest))
+        stale = [Q(tip_id=other, neighbor_id=tip.pk) for other in stale]
+        stale += [Q(tip_id=other, neighbor_id=weakest) for other, weakest in dropped]
+        if stale:
+            TipSimilarity.objects.filter(Q(*stale, _connector=Q.OR)).delete()
+        TipSimilarity.objects.bulk_create(created, batch_size=1000)
+    _corpus_changed()
+
+
+def similar_tips(tip, limit=4):
+    return (
+        RecyclingTip.objects.filter(similar_to__tip=tip)
+        .select_related('author').defer('content')
+        .order_by('-similar_to__score')[:limit]
+    )
+
+
+@receiver(post_save, sender=RecyclingTip)
+def tip_saved(sender, instance, update_fields=None, **kwargs):
+    # View counter flushes and featuring don't change the text
+    if update_fields and not {'title', 'content'} & set(update_fields):
+        return
+    update_tip(instance)
+
+
+@receiver(post_delete, sender=RecyclingTip)
+def tip_deleted(sender, instance, **kwargs):
+    # The cascade already removed its rows in both directions
+    get_corpus().remove(instance.pk)
+    _corpus_changed()
@@ -10,6 +10,7 @@ urlpatterns = [
     path('', views.TipListView.as_view(), name='tip_list'),
     path('my-tips/', views.my_tips, name='my_tips'),
     path('favorites/', views.favorite_tips, name='favorite_tips'),
+    path('most-saved/', views.most_saved_tips, name='most_saved'),
     path('clear-history/', views.clear_tip_history, name='clear_history'),
     path('create/', views.TipCreateView.as_view(), name='tip_create'),
     path('<slug:slug>/', views.TipDetailView.as_view(), name='tip_detail'),
@@ -6,22 +6,26 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.core.paginator import Paginator
+from django.db import transaction
 from django.db.models import Q
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.urls import reverse_lazy
 from django.http import JsonResponse
-from .models import RecyclingTip, TipCategory, FavoriteTip
+from core import recent, refdata
+from core.pagination import CursorPaginationMixin
+from .models import RecyclingTip, FavoriteTip
 from .forms import RecyclingTipForm
+from . import favorites, similarity
 
-class TipListView(ListView):
+class TipListView(CursorPaginationMixin, ListView):
     model = RecyclingTip
     template_name = 'tips/tip_list.html'
     context_object_name = 'tips'
     paginate_by = 12
     
     def get_queryset(self):
-        queryset = RecyclingTip.objects.all().select_related('category', 'author')
+        queryset = RecyclingTip.objects.all().select_related('category', 'author').defer('content')
         
         # Search by keyword
         search_query = self.request.GET.get('search', '')
@@ -40,26 +44,23 @@ class TipListView(ListView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['categories'] = TipCategory.objects.all()
+        context['categories'] = refdata.tip_categories.get()
         context['search_query'] = self.request.GET.get('search', '')
         context['selected_category'] = self.request.GET.get('category', '')
-        context['featured_tips'] = RecyclingTip.objects.filter(is_featured=True)[:3]
+        context['featured_tips'] = refdata.featured_tips.get()
+        context['trending_tips'] = favorites.trending_tips()
         
-        # Get user's favorite tips if logged in
+        # Get user's favorite tips if logged in (cached until they toggle one)
         if self.request.user.is_authenticated:
-            favorite_tip_ids = FavoriteTip.objects.filter(
-                user=self.request.user
-            ).values_list('tip_id', flat=True)
-            context['favorite_tip_ids'] = list(favorite_tip_ids)
+            context['favorite_tip_ids'] = favorites.favorite_ids(self.request.user)
         else:
             context['favorite_tip_ids'] = []
         
-        # Get recently viewed tips from session
-        recently_viewed = self.request.session.get('recently_viewed_tips', [])
+        # Recently viewed tips, most recent first
+        recently_viewed = list(recent.get(self.request, 'tips'))[:5]
         if recently_viewed:
-            context['recently_viewed_tips'] = RecyclingTip.objects.filter(
-                id__in=recently_viewed
-            )[:5]
+            found = RecyclingTip.objects.only('title', 'slug').in_bulk(recently_viewed)
+            context['recently_viewed_tips'] = [found[pk] for pk in recently_viewed if pk in found]
         
         return context
 
@@ -76,21 +77,14 @@ class TipDetailView(DetailView):
         if not self.request.user == obj.author:
             obj.increment_views()
         
-        # Add to recently viewed in session
-        recently_viewed = self.request.session.get('recently_viewed_tips', [])
-        if obj.id in recently_viewed:
-            recently_viewed.remove(obj.id)
-        recently_viewed.insert(0, obj.id)
-        self.request.session['recently_viewed_tips'] = recently_viewed[:10]
-        self.request.session.modified = True
+        # Add to recently viewed (a cookie, so viewing never writes the session)
+        recent.get(self.request, 'tips').add(obj.id)
         
         return obj
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['related_tips'] = RecyclingTip.objects.filter(
-            category=self.object.category
-        ).exclude(id=self.object.id)[:4]
+        context['related_tips'] = similarity.similar_tips(self.object)
         
         # Check if user has favorited this tip
         if self.request.user.is_authenticated:
@@ -150,10 +144,21 @@ class TipDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
 @login_required
 def toggle_favorite(request, slug):
     tip = get_object_or_404(RecyclingTip, slug=slug)
-    favorite, created = FavoriteTip.objects.get_or_create(user=request.user, tip=tip)
-    
-    if not created:
-        favorite.delete()
+    # The counter only moves when a row was really added or removed
+    with transaction.atomic():
+        deleted = 0
+        favorite = FavoriteTip.objects.filter(user=request.user, tip=tip).only('created_at').first()
+        if favorite is not None:
+            deleted, _ = FavoriteTip.objects.filter(pk=favorite.pk).delete()
+        if deleted:
+            favorites.remove(tip, favorite.created_at)
+        else:
+            _, created = FavoriteTip.objects.get_or_create(user=request.user, tip=tip)
+            if created:
+                favorites.add(tip)
+    favorites.forget_favorite_ids(request.user)
+
+    if deleted:
         is_favorited = False
         message = 'Tip removed from favorites'
     else:
@@ -171,15 +176,18 @@ def toggle_favorite(request, slug):
 
 @login_required
 def my_tips(request):
-    tips = RecyclingTip.objects.filter(author=request.user).select_related('category')
+    tips = RecyclingTip.objects.filter(author=request.user).select_related('category').defer('content')
     return render(request, 'tips/my_tips.html', {'tips': tips})
 
+def most_saved_tips(request):
+    return render(request, 'tips/most_saved.html', {'boards': favorites.most_saved()})
+
 @login_required
 def favorite_tips(request):
-    favorites = FavoriteTip.objects.filter(user=request.user).select_related('tip__category', 'tip__author')
+    favorites = FavoriteTip.objects.filter(user=request.user).select_related('tip__category', 'tip__author').defer('tip__content')
     return render(request, 'tips/favorite_tips.html', {'favorites': favorites})
 
 def clear_tip_history(request):
-    request.session['recently_viewed_tips'] = []
+    recent.get(request, 'tips').clear()
     messages.success(request, 'Tip viewing history cleared!')
     return redirect('tips:tip_list')